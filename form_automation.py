@@ -13,9 +13,18 @@ usando técnicas de simulación. Es útil para:
 import time
 import random
 import pandas as pd
+import requests
 import platform
 import os
+import csv
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlsplit, urljoin
+from bs4 import BeautifulSoup
+from openpyxl import load_workbook
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -23,13 +32,392 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import NoSuchElementException, InvalidSelectorException
+from web_scraping import ChromeDriverPool, BrowserStartError, create_http_session, needs_javascript, resolve_parser
+
+
+def create_form_driver():
+    """Crea el Chrome usado para llenar formularios (con ventana, sin imágenes)"""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    # Chrome ignora --disable-images: las imágenes se bloquean con la preferencia de contenido
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+    })
+    
+    if platform.system() == "Darwin":
+        chrome_paths = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            "/Applications/Chromium.app/Contents/MacOS/Chromium"
+        ]
+        for path in chrome_paths:
+            if os.path.exists(path):
+                options.binary_location = path
+                break
+    
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(30)
+    return driver
+
+
+class HostRateLimiter:
+    """
+    Límite de envíos por segundo para cada host de destino, compartido entre
+    hilos. Cada envío reserva el siguiente turno libre del host (separados
+    1/rate segundos) y espera a su turno fuera del candado.
+    """
+    
+    def __init__(self, rates=None, default_rate=None):
+        self.rates = dict(rates or {})  # {host: envíos por segundo}
+        self.default_rate = default_rate
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url):
+        """Espera hasta que el host de `url` admita otro envío; devuelve los segundos esperados"""
+        host = urlsplit(url).netloc
+        rate = self.rates.get(host, self.default_rate)
+        if not rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def field_selectors(field_name):
+    """Selectores candidatos para un campo, en orden de preferencia"""
+    return [
+        f"input[name='{field_name}']",
+        f"textarea[name='{field_name}']",
+        f"select[name='{field_name}']",
+        f"#{field_name}",
+        f"[name='{field_name}']"
+    ]
+
+
+# Script que rellena todos los campos en una sola llamada a execute_script.
+# Cada campo trae sus selectores candidatos (el cacheado primero); se asigna
+# el valor con el setter nativo (para que lo vean React/Vue) y se disparan
+# los eventos input/change. Devuelve {campo: selector usado o null}.
+FAST_FILL_SCRIPT = """
+const fields = arguments[0];
+const matched = {};
+for (const field of fields) {
+    matched[field.name] = null;
+    for (const selector of field.selectors) {
+        let nodes;
+        try {
+            nodes = Array.from(document.querySelectorAll(selector));
+        } catch (e) {
+            continue;
+        }
+        if (!nodes.length) {
+            continue;
+        }
+        let element = nodes[0];
+        const type = (element.type || '').toLowerCase();
+        if (type === 'radio' || type === 'checkbox') {
+            element = nodes.find(node => node.value === field.value) || element;
+            element.checked = true;
+        } else {
+            const proto = Object.getPrototypeOf(element);
+            const descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+            if (descriptor && descriptor.set) {
+                descriptor.set.call(element, field.value);
+            } else {
+                element.value = field.value;
+            }
+        }
+        element.dispatchEvent(new Event('input', {bubbles: true}));
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+        matched[field.name] = selector;
+        break;
+    }
+}
+return matched;
+"""
+
+
+class FormLocatorCache:
+    """
+    Caché de localizadores por formulario: {url del formulario: {campo: selector}}.
+    
+    El selector que funciona para cada campo se descubre una vez y se
+    reutiliza en los envíos siguientes (y en próximas ejecuciones si hay
+    `path`). Si un selector guardado deja de encontrar el campo se descarta
+    y se vuelve a descubrir.
+    """
+    
+    def __init__(self, path='cache_localizadores.json'):
+        self.path = path
+        self._locators = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._locators = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Caché de localizadores ilegible, se descarta: {e}")
+    
+    def get(self, form_url, field_name):
+        with self._lock:
+            return self._locators.get(form_url, {}).get(field_name)
+    
+    def put(self, form_url, field_name, selector):
+        with self._lock:
+            self._locators.setdefault(form_url, {})[field_name] = selector
+            self._dirty = True
+    
+    def invalidate(self, form_url, field_name):
+        with self._lock:
+            if self._locators.get(form_url, {}).pop(field_name, None) is not None:
+                self._dirty = True
+    
+    def save(self):
+        """Escribe la caché en disco si cambió (escritura atómica)"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._locators, ensure_ascii=False, indent=2)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+class FormSpec:
+    """
+    Estructura de un formulario HTML leída una sola vez: destino (`action`),
+    método, codificación y valores por defecto de sus campos (incluidos los
+    ocultos, como los tokens CSRF). Permite enviar registros por HTTP sin
+    abrir el navegador.
+    """
+    
+    def __init__(self, action, method='get', enctype='application/x-www-form-urlencoded', defaults=None,
+                 field_types=None):
+        self.action = action
+        self.method = method
+        self.enctype = enctype
+        self.defaults = defaults or {}
+        self.field_types = field_types or {}
+    
+    @classmethod
+    def from_html(cls, html, page_url, form_selector='form', parser='auto'):
+        """
+        Lee el formulario de una página. Devuelve None si no hay formulario o
+        si depende de JavaScript (página vacía sin JS, `onsubmit`,
+        `action="javascript:..."`), en cuyo caso hay que usar el navegador.
+        """
+        if needs_javascript(html):
+            return None
+        soup = BeautifulSoup(html, resolve_parser(parser))
+        form = soup.select_one(form_selector)
+        if form is None or form.get('onsubmit'):
+            return None
+        action = form.get('action', '').strip()
+        if action.lower().startswith('javascript:'):
+            return None
+        
+        defaults = {}
+        field_types = {}
+        for element in form.select('input[name], textarea[name], select[name]'):
+            name = element['name']
+            if element.name == 'textarea':
+                field_type = 'textarea'
+                value = element.get_text()
+            elif element.name == 'select':
+                field_type = 'select'
+                option = element.select_one('option[selected]') or element.select_one('option')
+                value = option.get('value', option.get_text(strip=True)) if option else None
+            else:
+                field_type = element.get('type', 'text').lower()
+                if field_type in ('submit', 'button', 'image', 'reset', 'file'):
+                    continue
+                if field_type in ('radio', 'checkbox') and not element.has_attr('checked'):
+                    field_types.setdefault(name, field_type)
+                    continue
+                value = element.get('value', 'on' if field_type in ('radio', 'checkbox') else '')
+            field_types.setdefault(name, field_type)
+            if value is None:
+                continue
+            if field_type == 'checkbox' and name in defaults:
+                defaults[name] = list(defaults[name]) if isinstance(defaults[name], list) else [defaults[name]]
+                defaults[name].append(value)
+            else:
+                defaults[name] = value
+        
+        return cls(
+            action=urljoin(page_url, action),
+            method=form.get('method', 'get').lower(),
+            enctype=form.get('enctype', 'application/x-www-form-urlencoded').lower(),
+            defaults=defaults,
+            field_types=field_types,
+        )
+    
+    def payload(self, values):
+        """Valores por defecto del formulario sustituidos por los del registro"""
+        data = dict(self.defaults)
+        for name, value in values.items():
+            if name not in self.field_types:
+                continue  # El formulario no tiene ese campo
+            data[name] = [str(item) for item in value] if isinstance(value, (list, tuple)) else str(value)
+        return data
+
+
+# Campos de un registro que usan validate_form_data, form_values y build_result
+FORM_RECORD_FIELDS = ('nombre', 'apellido', 'email', 'telefono', 'empresa', 'mensaje', 'edad', 'ciudad', 'interes')
+
+
+def parse_int(value):
+    """Entero a partir de '28', 28.0 o '28.0' (las celdas de Excel llegan como float)"""
+    return int(float(str(value).strip()))
+
+
+class FormRecordSource:
+    """
+    Registros para formularios leídos en streaming desde un fichero CSV,
+    Excel (openpyxl en modo read-only) o JSONL.
+    
+    Las filas se leen de una en una a medida que se consumen, así que un
+    fichero con cientos de miles de registros no se carga en memoria antes
+    del primer envío. `columns` renombra columnas del fichero a campos del
+    registro ({'Correo': 'email'}; None descarta la columna) y `converters`
+    convierte campos ({'edad': parse_int} por defecto). Un valor que no se
+    puede convertir queda como None y lo rechaza la validación.
+    """
+    
+    FORMATS = {'.csv': 'csv', '.xlsx': 'excel', '.xlsm': 'excel', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+    
+    def __init__(self, path, columns=None, converters=None, chunk_size=1000, sheet=None, encoding='utf-8-sig'):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in self.FORMATS:
+            raise ValueError(f"Formato de registros no soportado: {extension}")
+        self.path = path
+        self.format = self.FORMATS[extension]
+        self.columns = columns or {}
+        self.converters = {'edad': parse_int, **(converters or {})}
+        self.chunk_size = chunk_size
+        self.sheet = sheet
+        self.encoding = encoding
+    
+    def __iter__(self):
+        for row in self.iter_rows():
+            yield self.to_record(row)
+    
+    def iter_chunks(self):
+        """Registros en listas de `chunk_size` (para procesarlos por lotes)"""
+        chunk = []
+        for record in self:
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def iter_rows(self):
+        """Filas del fichero como {columna: valor}, sin transformar"""
+        if self.format == 'csv':
+            with open(self.path, newline='', encoding=self.encoding) as f:
+                yield from csv.DictReader(f)
+        elif self.format == 'jsonl':
+            with open(self.path, encoding=self.encoding) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            workbook = load_workbook(self.path, read_only=True, data_only=True)
+            try:
+                worksheet = workbook[self.sheet] if self.sheet else workbook.active
+                rows = worksheet.iter_rows(values_only=True)
+                header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+                for row in rows:
+                    if any(cell is not None for cell in row):
+                        yield dict(zip(header, row))
+            finally:
+                workbook.close()
+    
+    def to_record(self, row):
+        """Aplica el mapeo de columnas y las conversiones a una fila"""
+        record = dict.fromkeys(FORM_RECORD_FIELDS)
+        for column, value in row.items():
+            field = self.columns.get(column, column)
+            if field:
+                record[field] = value
+        for field, convert in self.converters.items():
+            value = record.get(field)
+            if value is None or value == '':
+                record[field] = None
+                continue
+            try:
+                record[field] = convert(value)
+            except (TypeError, ValueError):
+                record[field] = None
+        for field in FORM_RECORD_FIELDS:
+            if field not in self.converters:
+                value = record[field]
+                record[field] = '' if value is None else str(value).strip()
+        return record
+
 
 class FormAutomationRPA:
-    def __init__(self):
-        """Inicializa el bot de automatización de formularios"""
-        self.driver = None
+    # 'fast': todos los campos en un execute_script; 'human': tecleo campo a campo con pausas
+    FILL_MODES = ('fast', 'human')
+    # Modos de envío: HTTP directo, navegador o automático (HTTP si el formulario no necesita JS)
+    SUBMIT_MODES = ('auto', 'http', 'browser')
+    
+    def __init__(self, driver_pool=None, isolate_jobs=True, pool_size=1, rate_limits=None, default_rate=None,
+                 locator_cache='cache_localizadores.json', fill_mode='fast', submit_mode='auto'):
+        """
+        Inicializa el bot de automatización de formularios.
+        
+        El navegador se mantiene abierto entre formularios y cada envío usa
+        un contexto aislado (cookies y storage propios) en lugar de arrancar
+        y cerrar Chrome. `driver_pool` permite compartir los navegadores con
+        WebScrapingRealRPA u otros bots; `pool_size` es el número de
+        navegadores para envíos en paralelo. `rate_limits` ({host: envíos
+        por segundo}) y `default_rate` limitan el ritmo por destino.
+        `locator_cache` es el fichero donde se recuerdan los selectores de
+        cada formulario (None = solo en memoria). `fill_mode='human'` teclea
+        cada campo con pausas en lugar de rellenarlos todos de una vez.
+        Con `submit_mode='auto'` los formularios HTML simples se envían por
+        HTTP con una sesión compartida y solo los que dependen de JavaScript
+        usan Chrome.
+        """
+        if fill_mode not in self.FILL_MODES:
+            raise ValueError(f"Modo de llenado no válido: {fill_mode}")
+        if submit_mode not in self.SUBMIT_MODES:
+            raise ValueError(f"Modo de envío no válido: {submit_mode}")
+        self.fill_mode = fill_mode
+        self.submit_mode = submit_mode
+        self.http_session = create_http_session()
+        # Estructura de cada formulario ({url: FormSpec o None si necesita navegador})
+        self.form_specs = {}
+        self._form_specs_lock = threading.Lock()
         self.test_data = []
         self.form_results = []
+        self.form_url = "https://httpbin.org/forms/post"
+        self.rate_limiter = HostRateLimiter(rate_limits, default_rate)
+        self.locator_cache = FormLocatorCache(locator_cache)
+        # El aislamiento es de este bot, aunque el pool sea compartido
+        self.isolate_jobs = isolate_jobs
+        self._owns_driver_pool = driver_pool is None
+        self.driver_pool = driver_pool or ChromeDriverPool(
+            size=pool_size,
+            max_pages_per_driver=200,
+            driver_factory=create_form_driver,
+            isolate_contexts=isolate_jobs,
+        )
         self.generate_test_data()
         
     def generate_test_data(self):
@@ -76,26 +464,14 @@ class FormAutomationRPA:
         print(f"✅ Generados {len(test_users)} conjuntos de datos de prueba")
         
     def setup_chrome_driver(self):
-        """Configura el driver de Chrome para automatización real"""
+        """
+        Arranca de antemano un navegador del pool (fill_form_real ya lo pide
+        al pool cuando lo necesita). Devuelve True si Chrome está listo.
+        """
         print("🔧 Configurando Chrome para automatización de formularios...")
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-images')
-            
-            if platform.system() == "Darwin":
-                chrome_paths = [
-                    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-                    "/Applications/Chromium.app/Contents/MacOS/Chromium"
-                ]
-                for path in chrome_paths:
-                    if os.path.exists(path):
-                        options.binary_location = path
-                        break
-            
-            self.driver = webdriver.Chrome(options=options)
-            self.driver.set_page_load_timeout(30)
+            with self.driver_pool.borrow():
+                pass
             print("✅ Chrome configurado para automatización real")
             return True
             
@@ -107,83 +483,190 @@ class FormAutomationRPA:
         """Llena formulario real usando Selenium"""
         print(f"\n📋 Llenando formulario real para: {user_data['nombre']} {user_data['apellido']}")
         
-        if not self.setup_chrome_driver():
-            print("❌ No se pudo configurar Chrome. Cambiando a simulación...")
-            return self.simulate_form_filling(user_data)
-            
-        try:
-            # Usar un formulario de prueba real
-            form_url = "https://httpbin.org/forms/post"
-            print(f"🌐 Navegando a formulario real: {form_url}")
-            self.driver.get(form_url)
-            
-            # Esperar a que cargue la página
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "form"))
-            )
-            
-            # Llenar campos del formulario
-            print("   📝 Llenando campos del formulario...")
-            
-            # Buscar y llenar campos por nombre o ID
-            form_fields = {
-                'custname': user_data['nombre'] + ' ' + user_data['apellido'],
-                'custtel': user_data['telefono'],
-                'custemail': user_data['email'],
-                'size': 'medium',  # Radio button
-                'topping': 'bacon',  # Checkbox
-                'delivery': user_data['mensaje'][:50],  # Textarea
-                'comments': user_data['mensaje']
-            }
-            
-            for field_name, value in form_fields.items():
+        if self.submit_mode != 'browser':
+            try:
+                spec = self.get_form_spec(self.form_url)
+            except requests.RequestException as e:
+                print(f"   ❌ No se pudo leer el formulario: {e}")
+                return False
+            if spec:
                 try:
-                    # Intentar diferentes selectores
-                    selectors = [
-                        f"input[name='{field_name}']",
-                        f"textarea[name='{field_name}']",
-                        f"select[name='{field_name}']",
-                        f"#{field_name}",
-                        f"[name='{field_name}']"
-                    ]
-                    
-                    element = None
-                    for selector in selectors:
-                        try:
-                            element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except:
-                            continue
-                    
-                    if element:
-                        element.clear()
-                        element.send_keys(str(value))
-                        print(f"   ✅ Campo {field_name}: {value}")
-                        time.sleep(0.3)  # Pausa realista
-                    else:
-                        print(f"   ⚠️ Campo {field_name} no encontrado")
-                        
-                except Exception as e:
-                    print(f"   ❌ Error llenando {field_name}: {e}")
-            
-            # Simular envío del formulario
-            print("   📤 Enviando formulario...")
-            submit_button = self.driver.find_element(By.CSS_SELECTOR, "input[type='submit']")
-            submit_button.click()
-            
-            # Esperar respuesta
-            time.sleep(2)
-            
-            print("   ✅ Formulario enviado exitosamente")
-            return True
-            
+                    return self.submit_form_http(spec, user_data)
+                except requests.RequestException as e:
+                    print(f"   ❌ Error durante el envío por HTTP: {e}")
+                    return False
+            if self.submit_mode == 'http':
+                print("   ❌ El formulario necesita JavaScript y el modo de envío es 'http'")
+                return False
+        
+        try:
+            # Navegador del pool, en un contexto aislado para este envío
+            with self.driver_pool.borrow(isolate=self.isolate_jobs) as driver:
+                return self.submit_form(driver, user_data)
+        except BrowserStartError as e:
+            print(f"❌ No se pudo configurar Chrome ({e}). Cambiando a simulación...")
+            return self.simulate_form_filling(user_data)
         except Exception as e:
             print(f"   ❌ Error durante llenado real: {e}")
             return False
-        finally:
-            if self.driver:
-                self.driver.quit()
-                print("   🔒 Navegador cerrado")
+    
+    def submit_form(self, driver, user_data):
+        """Llena y envía el formulario de prueba con un navegador ya preparado"""
+        # Usar un formulario de prueba real
+        form_url = self.form_url
+        self.rate_limiter.wait(form_url)
+        print(f"🌐 Navegando a formulario real: {form_url}")
+        driver.get(form_url)
+        
+        # Esperar a que cargue la página
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "form"))
+        )
+        
+        # Llenar campos del formulario
+        print("   📝 Llenando campos del formulario...")
+        
+        # Buscar y llenar campos por nombre o ID
+        form_fields = self.form_values(user_data)
+        
+        if self.fill_mode == 'fast':
+            self.fill_fields_fast(driver, form_url, form_fields)
+        else:
+            self.fill_fields_human(driver, form_url, form_fields)
+        
+        self.locator_cache.save()
+        
+        # Simular envío del formulario
+        print("   📤 Enviando formulario...")
+        submit_button = driver.find_element(By.CSS_SELECTOR, "input[type='submit']")
+        page_url = driver.current_url
+        submit_button.click()
+        
+        # Esperar respuesta: el envío termina cuando se deja la página del formulario
+        WebDriverWait(driver, 10).until(EC.any_of(
+            EC.staleness_of(submit_button),
+            EC.url_changes(page_url),
+        ))
+        
+        print("   ✅ Formulario enviado exitosamente")
+        return True
+        
+    def form_values(self, user_data):
+        """Valores de cada campo del formulario de prueba para un registro"""
+        return {
+            'custname': user_data['nombre'] + ' ' + user_data['apellido'],
+            'custtel': user_data['telefono'],
+            'custemail': user_data['email'],
+            'size': 'medium',  # Radio button
+            'topping': 'bacon',  # Checkbox
+            'delivery': user_data['mensaje'][:50],  # Textarea
+            'comments': user_data['mensaje']
+        }
+    
+    def get_form_spec(self, form_url):
+        """
+        Descarga y analiza el formulario una sola vez por URL. Devuelve None
+        si necesita navegador. Los campos ocultos (tokens CSRF) se leen con la
+        sesión compartida, cuyas cookies acompañan después a cada envío.
+        """
+        with self._form_specs_lock:
+            if form_url not in self.form_specs:
+                response = self.http_session.get(form_url, timeout=15)
+                response.raise_for_status()
+                spec = FormSpec.from_html(response.text, response.url)
+                if spec:
+                    print(f"   🔎 Formulario HTML simple ({spec.method.upper()} {spec.action}): envío por HTTP")
+                else:
+                    print("   🔎 El formulario depende de JavaScript: envío con Chrome")
+                self.form_specs[form_url] = spec
+            return self.form_specs[form_url]
+    
+    def submit_form_http(self, spec, user_data):
+        """Envía el formulario directamente por HTTP, sin navegador"""
+        self.rate_limiter.wait(spec.action)
+        data = spec.payload(self.form_values(user_data))
+        if spec.method == 'post':
+            if spec.enctype == 'multipart/form-data':
+                files = [(name, (None, item)) for name, value in data.items()
+                         for item in (value if isinstance(value, list) else [value])]
+                response = self.http_session.post(spec.action, files=files, timeout=15)
+            else:
+                response = self.http_session.post(spec.action, data=data, timeout=15)
+        else:
+            response = self.http_session.get(spec.action, params=data, timeout=15)
+        if response.status_code >= 400:
+            print(f"   ❌ Envío rechazado: HTTP {response.status_code}")
+            return False
+        print(f"   ✅ Formulario enviado por HTTP ({response.status_code}, "
+              f"{response.elapsed.total_seconds() * 1000:.0f} ms)")
+        return True
+    
+    def fill_fields_fast(self, driver, form_url, form_fields):
+        """
+        Rellena todos los campos con un único execute_script (ver
+        FAST_FILL_SCRIPT) y actualiza la caché con los selectores usados.
+        """
+        fields = []
+        for field_name, value in form_fields.items():
+            cached = self.locator_cache.get(form_url, field_name)
+            selectors = field_selectors(field_name)
+            if cached:
+                selectors = [cached] + [selector for selector in selectors if selector != cached]
+            fields.append({'name': field_name, 'selectors': selectors, 'value': str(value)})
+        
+        start = time.perf_counter()
+        matched = driver.execute_script(FAST_FILL_SCRIPT, fields)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        for field_name, value in form_fields.items():
+            selector = matched.get(field_name)
+            if selector:
+                if selector != self.locator_cache.get(form_url, field_name):
+                    self.locator_cache.put(form_url, field_name, selector)
+                print(f"   ✅ Campo {field_name}: {value}")
+            else:
+                self.locator_cache.invalidate(form_url, field_name)
+                print(f"   ⚠️ Campo {field_name} no encontrado")
+        print(f"   ⚡ {len(form_fields)} campos rellenados en {elapsed_ms:.0f} ms")
+    
+    def fill_fields_human(self, driver, form_url, form_fields):
+        """Teclea campo a campo con pausas, imitando a una persona"""
+        for field_name, value in form_fields.items():
+            try:
+                element = self.find_field(driver, form_url, field_name)
+                
+                if element:
+                    element.clear()
+                    element.send_keys(str(value))
+                    print(f"   ✅ Campo {field_name}: {value}")
+                    time.sleep(0.3)  # Pausa realista
+                else:
+                    print(f"   ⚠️ Campo {field_name} no encontrado")
+                    
+            except Exception as e:
+                print(f"   ❌ Error llenando {field_name}: {e}")
+    
+    def find_field(self, driver, form_url, field_name):
+        """
+        Localiza un campo del formulario. Usa el selector cacheado para este
+        formulario (una sola llamada a WebDriver) y solo si ya no coincide
+        prueba los candidatos de field_selectors().
+        """
+        selector = self.locator_cache.get(form_url, field_name)
+        if selector:
+            try:
+                return driver.find_element(By.CSS_SELECTOR, selector)
+            except (NoSuchElementException, InvalidSelectorException):
+                self.locator_cache.invalidate(form_url, field_name)
+        
+        for selector in field_selectors(field_name):
+            try:
+                element = driver.find_element(By.CSS_SELECTOR, selector)
+            except (NoSuchElementException, InvalidSelectorException):
+                continue
+            self.locator_cache.put(form_url, field_name, selector)
+            return element
+        return None
         
     def simulate_form_filling(self, user_data):
         """Simula el llenado de un formulario con datos proporcionados"""
@@ -241,7 +724,7 @@ class FormAutomationRPA:
             errors.append("Teléfono inválido")
             
         # Validar edad
-        if user_data['edad'] < 18 or user_data['edad'] > 100:
+        if not isinstance(user_data['edad'], int) or user_data['edad'] < 18 or user_data['edad'] > 100:
             errors.append("Edad inválida")
             
         # Validar campos requeridos
@@ -312,21 +795,8 @@ class FormAutomationRPA:
         """Guarda los resultados del envío de formularios"""
         print(f"\n💾 Guardando resultados en {filename}...")
         
-        # Crear DataFrame con los resultados
-        results_data = []
-        for user in self.test_data:
-            results_data.append({
-                'Nombre': user['nombre'],
-                'Apellido': user['apellido'],
-                'Email': user['email'],
-                'Teléfono': user['telefono'],
-                'Empresa': user['empresa'],
-                'Edad': user['edad'],
-                'Ciudad': user['ciudad'],
-                'Interés': user['interes'],
-                'Estado': 'Enviado',
-                'Fecha_Envio': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
+        # Crear DataFrame con los resultados (en el orden de los datos de entrada)
+        results_data = self.form_results or [self.build_result(user, 'Enviado') for user in self.test_data]
             
         df = pd.DataFrame(results_data)
         df.to_excel(filename, index=False, engine='openpyxl')
@@ -339,8 +809,95 @@ class FormAutomationRPA:
         print(f"   🌍 Ciudades: {df['Ciudad'].nunique()}")
         print(f"   🎯 Intereses únicos: {df['Interés'].nunique()}")
         
-    def run_form_automation(self):
-        """Ejecuta el proceso completo de automatización de formularios"""
+    def build_result(self, user_data, estado, seconds=None):
+        """Fila de resultados de un formulario"""
+        return {
+            'Nombre': user_data.get('nombre'),
+            'Apellido': user_data.get('apellido'),
+            'Email': user_data.get('email'),
+            'Teléfono': user_data.get('telefono'),
+            'Empresa': user_data.get('empresa'),
+            'Edad': user_data.get('edad'),
+            'Ciudad': user_data.get('ciudad'),
+            'Interés': user_data.get('interes'),
+            'Estado': estado,
+            'Fecha_Envio': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'Segundos': round(seconds, 3) if seconds is not None else None,
+        }
+    
+    def process_form(self, index, user_data):
+        """Valida, resuelve el captcha y envía un formulario; devuelve su fila de resultados"""
+        start = time.perf_counter()
+        if not self.validate_form_data(user_data):
+            print(f"   ❌ Formulario {index} omitido debido a errores de validación")
+            estado = 'Datos inválidos'
+        elif not self.handle_captcha():
+            print(f"   ❌ Formulario {index} omitido debido a captcha")
+            estado = 'Captcha fallido'
+        elif self.fill_form_real(user_data):
+            estado = 'Enviado'
+        else:
+            estado = 'Error'
+        return self.build_result(user_data, estado, time.perf_counter() - start)
+    
+    def iter_form_submissions(self, records, workers=None, max_pending=None):
+        """
+        Envía formularios en paralelo y va devolviendo sus resultados en el
+        mismo orden que `records`.
+        
+        Cada uno de los `workers` hilos reutiliza un navegador del pool (por
+        defecto tantos hilos como navegadores). Como mucho hay `max_pending`
+        envíos en curso o esperando turno, así que `records` puede ser un
+        iterador muy largo sin cargarlo entero en memoria.
+        """
+        workers = workers or self.driver_pool.size
+        max_pending = max_pending or workers * 2
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='formulario') as executor:
+            for index, user_data in enumerate(records, 1):
+                pending.append(executor.submit(self.process_form, index, user_data))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def submit_forms_parallel(self, records=None, workers=None):
+        """Envía `records` (por defecto self.test_data) en paralelo y guarda los resultados ordenados"""
+        records = self.test_data if records is None else records
+        workers = workers or self.driver_pool.size
+        if self._owns_driver_pool and workers > self.driver_pool.size:
+            self.driver_pool.size = workers  # Un navegador reutilizado por hilo
+        print(f"\n🚀 Enviando formularios con {workers} navegadores en paralelo...")
+        
+        start = time.perf_counter()
+        self.form_results = []
+        for result in self.iter_form_submissions(records, workers=workers):
+            self.form_results.append(result)
+        elapsed = time.perf_counter() - start
+        
+        sent = sum(1 for result in self.form_results if result['Estado'] == 'Enviado')
+        rate = len(self.form_results) / elapsed * 60 if elapsed else 0
+        print(f"   📊 {sent}/{len(self.form_results)} formularios enviados en {elapsed:.1f}s "
+              f"({rate:.1f} formularios/min)")
+        return self.form_results
+    
+    def close(self):
+        """Cierra los navegadores del pool propio (uno compartido lo cierra su dueño) y la sesión HTTP"""
+        if self._owns_driver_pool:
+            self.driver_pool.close()
+        self.http_session.close()
+        
+    def load_records(self, path, **options):
+        """Fuente de registros en streaming desde CSV, Excel o JSONL (ver FormRecordSource)"""
+        return FormRecordSource(path, **options)
+        
+    def run_form_automation(self, workers=1, records=None):
+        """
+        Ejecuta el proceso completo de automatización de formularios.
+        
+        `records` (por ejemplo load_records('clientes.csv')) sustituye a los
+        datos de prueba y se consume a medida que se envía.
+        """
         print("🚀 Iniciando proceso de Automatización de Formularios RPA")
         print("=" * 60)
         
@@ -352,32 +909,27 @@ class FormAutomationRPA:
             self.simulate_multiple_form_types()
             
             # 3. Procesar cada conjunto de datos
-            successful_forms = 0
-            for i, user_data in enumerate(self.test_data, 1):
-                print(f"\n--- Procesando formulario {i}/{len(self.test_data)} ---")
-                
-                # Validar datos
-                if self.validate_form_data(user_data):
-                    # Manejar captcha si es necesario
-                    captcha_success = self.handle_captcha()
-                    
-                    if captcha_success:
-                        # Llenar y enviar formulario (intenta real, fallback a simulación)
-                        if self.fill_form_real(user_data):
-                            successful_forms += 1
-                    else:
-                        print(f"   ❌ Formulario {i} omitido debido a captcha")
-                else:
-                    print(f"   ❌ Formulario {i} omitido debido a errores de validación")
+            # (validación, captcha y envío real con fallback a simulación)
+            records = self.test_data if records is None else records
+            if workers > 1:
+                self.submit_forms_parallel(records, workers=workers)
+            else:
+                self.form_results = []
+                for i, user_data in enumerate(records, 1):
+                    print(f"\n--- Procesando formulario {i} ---")
+                    self.form_results.append(self.process_form(i, user_data))
+            successful_forms = sum(1 for result in self.form_results if result['Estado'] == 'Enviado')
                     
             # 4. Guardar resultados
             self.save_form_results()
             
             print(f"\n🎉 Proceso de automatización de formularios completado!")
-            print(f"✅ Formularios enviados exitosamente: {successful_forms}/{len(self.test_data)}")
+            print(f"✅ Formularios enviados exitosamente: {successful_forms}/{len(self.form_results)}")
             
         except Exception as e:
             print(f"❌ Error en el proceso: {e}")
+        finally:
+            self.close()
 
 def main():
     """Función principal para ejecutar el ejemplo"""
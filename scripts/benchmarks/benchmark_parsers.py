@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Parsers HTML para Web Scraping
+===========================================
+
+Compara los backends de BeautifulSoup (lxml, html5lib, html.parser) usando
+las páginas guardadas en `fixtures/`, midiendo parseo + extracción con los
+mismos esquemas de extracción que usa `web_scraping.py`.
+
+Si `selectolax` está instalado se incluye también como referencia de un
+parser en C puro (solo parseo, ya que no es compatible con BeautifulSoup).
+
+Uso:
+    python scripts/benchmarks/benchmark_parsers.py [--repeticiones 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+sys.path.insert(0, os.path.dirname(os.path.dirname(BENCHMARKS_DIR)))
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from web_scraping import PARSER_BACKENDS, extract_records
+
+# Extractor usado para cada fixture
+FIXTURE_SITE_TYPES = {
+    'articulo.html': 'noticias',
+    'empleos.html': 'empleos',
+    'catalogo.html': 'ecommerce',
+}
+
+
+def load_fixtures():
+    """Carga las páginas HTML guardadas"""
+    fixtures = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+                fixtures[name] = f.read()
+    return fixtures
+
+
+def time_call(func, repetitions):
+    """Devuelve el tiempo medio en milisegundos de ejecutar func"""
+    func()  # Calentamiento
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        func()
+    return (time.perf_counter() - start) * 1000 / repetitions
+
+
+def bench_bs4(html, parser, site_type):
+    def run():
+        soup = BeautifulSoup(html, parser)
+        extract_records(site_type, soup, 'http://localhost/fixture', 'Benchmark', html)
+    return run
+
+
+def load_selectolax():
+    """Devuelve la clase de parser de selectolax disponible, o None"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+    except ImportError:
+        pass
+    try:
+        from selectolax.parser import HTMLParser
+        return HTMLParser
+    except ImportError:
+        return None
+
+
+def bench_selectolax(parser_class, html):
+    def run():
+        tree = parser_class(html)
+        [node.text(strip=True) for node in tree.css('title, h1, h2, h3, p, div, span')]
+    return run
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de parsers HTML")
+    arg_parser.add_argument('--repeticiones', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    print("⏱️ Benchmark de parsers HTML")
+    print("=" * 70)
+
+    backends = [name for name in PARSER_BACKENDS if builder_registry.lookup(name)]
+    missing = [name for name in PARSER_BACKENDS if name not in backends]
+    if missing:
+        print(f"⚠️ Backends no instalados: {', '.join(missing)}")
+    selectolax_parser = load_selectolax()
+
+    for name, html in load_fixtures().items():
+        site_type = FIXTURE_SITE_TYPES.get(name, 'noticias')
+        print(f"\n📄 {name} ({len(html) / 1024:.1f} KB, extractor '{site_type}')")
+
+        results = []
+        for parser in backends:
+            ms = time_call(bench_bs4(html, parser, site_type), args.repeticiones)
+            results.append((f"bs4 + {parser}", ms))
+        if selectolax_parser:
+            ms = time_call(bench_selectolax(selectolax_parser, html), args.repeticiones)
+            results.append(("selectolax (solo parseo)", ms))
+
+        baseline = dict(results).get('bs4 + html.parser')
+        for label, ms in sorted(results, key=lambda item: item[1]):
+            speedup = f"x{baseline / ms:.1f}" if baseline else ""
+            print(f"   {label:<28} {ms:8.2f} ms/página  {1000 / ms:8.1f} páginas/s  {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark del Pipeline Completo de Web Scraping (sin red)
+=========================================================
+
+Sirve las páginas de `fixtures/` desde un servidor HTTP local y ejecuta el
+pipeline completo de `web_scraping.py` (descarga → parseo → extracción →
+guardado) con distintas configuraciones: HTTP directo o Selenium, backend
+de parseo, nivel de concurrencia y parseo en procesos.
+
+Cada configuración se ejecuta en un subproceso nuevo para que la memoria
+pico (RSS) y el tiempo de CPU de una no contaminen a las demás. Se informa
+de páginas/s, tiempo de CPU y RSS pico, y se puede comparar con una
+ejecución anterior guardada para detectar regresiones.
+
+Uso:
+    python scripts/benchmarks/benchmark_pipeline.py [--paginas 200]
+        [--configs http-lxml-c32,http-pipeline] [--incluir-navegador]
+        [--guardar resultados.json] [--baseline resultados.json --tolerancia 0.15]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+import contextlib
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+sys.path.insert(0, os.path.dirname(os.path.dirname(BENCHMARKS_DIR)))
+
+# Extractor usado para cada fixture
+FIXTURE_SITE_TYPES = {
+    'articulo.html': 'noticias',
+    'empleos.html': 'empleos',
+    'catalogo.html': 'ecommerce',
+}
+
+# Configuraciones a comparar: modo de descarga, parser, concurrencia y
+# si el parseo se hace en un pool de procesos
+CONFIGS = {
+    'http-html.parser-c1': {'fetch_mode': 'http', 'parser': 'html.parser', 'concurrency': 1},
+    'http-html.parser-c32': {'fetch_mode': 'http', 'parser': 'html.parser', 'concurrency': 32},
+    'http-lxml-c1': {'fetch_mode': 'http', 'parser': 'lxml', 'concurrency': 1},
+    'http-lxml-c8': {'fetch_mode': 'http', 'parser': 'lxml', 'concurrency': 8},
+    'http-lxml-c32': {'fetch_mode': 'http', 'parser': 'lxml', 'concurrency': 32},
+    'http-pipeline': {'fetch_mode': 'http', 'parser': 'lxml', 'concurrency': 32, 'pipeline': True},
+    'chrome-c2': {'fetch_mode': 'browser', 'parser': 'lxml', 'concurrency': 2, 'browser': True},
+    'chrome-ligero-c2': {'fetch_mode': 'browser', 'parser': 'lxml', 'concurrency': 2, 'browser': True,
+                         'performance_profile': True},
+    'chrome-extraccion-js-c2': {'fetch_mode': 'browser', 'parser': 'lxml', 'concurrency': 2, 'browser': True,
+                                'extraction': 'browser'},
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Sirve los fixtures sin escribir una línea de log por petición"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    """Arranca el servidor de fixtures en un puerto libre y devuelve su URL base"""
+    handler = partial(QuietHandler, directory=FIXTURES_DIR)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def build_urls(base_url, pages):
+    """
+    Reparte `pages` URLs entre los fixtures. Cada URL lleva un parámetro
+    distinto para que ninguna capa la trate como repetida.
+    """
+    names = sorted(FIXTURE_SITE_TYPES)
+    urls = {name: [] for name in names}
+    for i in range(pages):
+        name = names[i % len(names)]
+        urls[name].append(f"{base_url}/{name}?n={i}")
+    return urls
+
+
+def run_config(name, base_url, pages, output_dir):
+    """Ejecuta una configuración dentro de este proceso y devuelve sus métricas"""
+    from web_scraping import WebScrapingRealRPA
+
+    config = CONFIGS[name]
+    output = os.path.join(output_dir, f"{name}.jsonl")
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+
+    stats = {'pages': 0, 'records': 0, 'errors': 0}
+    # Los mensajes del scraper no forman parte de la salida del benchmark
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        scraper = WebScrapingRealRPA(
+            pool_size=config['concurrency'] if config.get('browser') else 1,
+            fetch_mode=config['fetch_mode'],
+            parser=config['parser'],
+            output=output,
+            performance_profile=config.get('performance_profile', False),
+            extraction=config.get('extraction', 'python'),
+        )
+        try:
+            for fixture, urls in build_urls(base_url, pages).items():
+                scrape = scraper.scrape_urls_pipeline if config.get('pipeline') else scraper.scrape_urls
+                result = scrape(urls, site_type=FIXTURE_SITE_TYPES[fixture],
+                                max_in_flight=config['concurrency'],
+                                per_host_limit=config['concurrency'])
+                for key in stats:
+                    stats[key] += result[key]
+            scraper.save_results()
+        finally:
+            scraper.close()
+
+    elapsed = time.perf_counter() - start
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (usage_self.ru_utime + usage_self.ru_stime - usage_start.ru_utime - usage_start.ru_stime
+           + usage_children.ru_utime + usage_children.ru_stime)
+    return {
+        'config': name,
+        'pages': stats['pages'],
+        'records': stats['records'],
+        'errors': stats['errors'],
+        'seconds': elapsed,
+        'pages_per_second': stats['pages'] / elapsed if elapsed else 0,
+        'cpu_seconds': cpu,
+        # ru_maxrss está en KB en Linux; los procesos de parseo cuentan aparte
+        'peak_rss_mb': max(usage_self.ru_maxrss, usage_children.ru_maxrss) / 1024,
+        'stages': {stage: sum(stats['total'] for stats in hosts.values())
+                   for stage, hosts in scraper.timer.summary().items()},
+    }
+
+
+def run_in_subprocess(name, base_url, pages, output_dir):
+    """Lanza la configuración en un proceso nuevo y lee su resultado en JSON"""
+    command = [sys.executable, os.path.abspath(__file__), '--worker', name,
+               '--base-url', base_url, '--paginas', str(pages), '--directorio', output_dir]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ['sin salida'])[-1]
+        return {'config': name, 'error': error}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def available_configs(include_browser):
+    """Configuraciones cuyo parser está instalado (y Chrome, si se pide)"""
+    from bs4.builder import builder_registry
+
+    names = []
+    for name, config in CONFIGS.items():
+        if config.get('browser') and not include_browser:
+            continue
+        if not builder_registry.lookup(config['parser']):
+            print(f"⚠️ {name}: parser '{config['parser']}' no instalado, se omite")
+            continue
+        names.append(name)
+    return names
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    """Marca las configuraciones más lentas que la ejecución de referencia"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {item['config']: item for item in json.load(f) if 'error' not in item}
+
+    regressions = []
+    print(f"\n📐 Comparación con {baseline_path} (tolerancia {tolerance:.0%}):")
+    for result in results:
+        reference = baseline.get(result['config'])
+        if 'error' in result or not reference or not reference['pages_per_second']:
+            continue
+        change = result['pages_per_second'] / reference['pages_per_second'] - 1
+        mark = "✅"
+        if change < -tolerance:
+            mark = "❌"
+            regressions.append(result['config'])
+        print(f"   {mark} {result['config']:<24} {reference['pages_per_second']:8.1f} → "
+              f"{result['pages_per_second']:8.1f} páginas/s ({change:+.0%})")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del pipeline de web scraping sin red")
+    arg_parser.add_argument('--paginas', type=int, default=200)
+    arg_parser.add_argument('--configs', help="Configuraciones separadas por comas (por defecto todas)")
+    arg_parser.add_argument('--incluir-navegador', action='store_true',
+                            help="Incluye las configuraciones con Selenium (necesita Chrome)")
+    arg_parser.add_argument('--guardar', help="Guarda los resultados en JSON")
+    arg_parser.add_argument('--baseline', help="Resultados anteriores con los que comparar")
+    arg_parser.add_argument('--tolerancia', type=float, default=0.15)
+    arg_parser.add_argument('--worker', help=argparse.SUPPRESS)
+    arg_parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    arg_parser.add_argument('--directorio', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_config(args.worker, args.base_url, args.paginas, args.directorio)))
+        return
+
+    if args.configs:
+        names = [name.strip() for name in args.configs.split(',')]
+        unknown = [name for name in names if name not in CONFIGS]
+        if unknown:
+            arg_parser.error(f"Configuraciones desconocidas: {', '.join(unknown)}")
+    else:
+        names = available_configs(args.incluir_navegador)
+
+    print("⏱️ Benchmark del pipeline de web scraping (fixtures locales)")
+    print("=" * 90)
+    server, base_url = start_fixture_server()
+    print(f"🌐 Fixtures servidos en {base_url}, {args.paginas} páginas por configuración\n")
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            for name in names:
+                result = run_in_subprocess(name, base_url, args.paginas, output_dir)
+                results.append(result)
+                if 'error' in result:
+                    print(f"   ❌ {name:<24} {result['error']}")
+                    continue
+                print(f"   {name:<24} {result['pages_per_second']:8.1f} páginas/s  "
+                      f"CPU {result['cpu_seconds']:6.2f} s  RSS pico {result['peak_rss_mb']:7.1f} MB  "
+                      f"({result['pages']} páginas, {result['records']} registros, {result['errors']} errores)")
+    finally:
+        server.shutdown()
+
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados guardados en {args.guardar}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerancia)
+        if regressions:
+            print(f"\n❌ Regresiones en: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
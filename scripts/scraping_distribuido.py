@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Web Scraping Distribuido con Cola Compartida
+============================================
+
+Reparte URLs entre varios workers (procesos o máquinas) a través de una
+cola SQLite compartida (`ScrapeJobQueue` en `web_scraping.py`). Cada worker
+toma trabajos en préstamo, envía latidos mientras los procesa y entrega un
+único resultado por URL; si un worker muere sus trabajos se reentregan.
+
+Uso:
+    python scripts/scraping_distribuido.py encolar --cola cola.db --tipo noticias urls.txt
+    python scripts/scraping_distribuido.py worker --cola cola.db [--id nodo-1] [--lote 8]
+    python scripts/scraping_distribuido.py estado --cola cola.db
+    python scripts/scraping_distribuido.py exportar --cola cola.db --salida resultados.jsonl
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web_scraping import WebScrapingRealRPA, ScrapeJobQueue
+
+
+def read_urls(paths):
+    """Lee URLs (una por línea) de ficheros o, con '-', de la entrada estándar"""
+    for path in paths:
+        handle = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        with handle:
+            for line in handle:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+
+
+def enqueue(args):
+    job_queue = ScrapeJobQueue(args.cola)
+    try:
+        added = job_queue.enqueue(read_urls(args.ficheros), site_type=args.tipo)
+        print(f"📥 {added} URLs nuevas encoladas en {args.cola} ({job_queue.stats()})")
+    finally:
+        job_queue.close()
+
+
+def run_worker(args):
+    scraper = WebScrapingRealRPA(pool_size=args.navegadores, fetch_mode=args.modo)
+    try:
+        scraper.run_worker(args.cola, worker_id=args.id, batch_size=args.lote,
+                           lease_seconds=args.prestamo, idle_timeout=args.espera_maxima)
+    finally:
+        scraper.close()
+
+
+def show_status(args):
+    job_queue = ScrapeJobQueue(args.cola)
+    try:
+        print(f"📋 Trabajos: {job_queue.stats()}")
+        now = time.time()
+        for worker in job_queue.workers():
+            print(f"   👷 {worker['worker_id']:<30} {worker['status']:<8} "
+                  f"último latido hace {now - worker['heartbeat_at']:6.1f}s  "
+                  f"{worker['pages']} páginas, {worker['records']} registros")
+    finally:
+        job_queue.close()
+
+
+def export(args):
+    scraper = WebScrapingRealRPA(fetch_mode='http', output=args.salida)
+    try:
+        scraper.collect_queue_results(args.cola)
+        scraper.save_results()
+    finally:
+        scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web scraping distribuido con una cola SQLite compartida")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--cola', default='cola_scraping.db', help="Base de datos de la cola")
+    commands = parser.add_subparsers(dest='comando', required=True)
+
+    enqueue_parser = commands.add_parser('encolar', parents=[common], help="Añade URLs a la cola")
+    enqueue_parser.add_argument('ficheros', nargs='+', help="Ficheros con una URL por línea ('-' = stdin)")
+    enqueue_parser.add_argument('--tipo', default='noticias', help="Tipo de sitio registrado")
+    enqueue_parser.set_defaults(func=enqueue)
+
+    worker_parser = commands.add_parser('worker', parents=[common], help="Procesa trabajos de la cola")
+    worker_parser.add_argument('--id', help="Identificador del worker (por defecto host-pid)")
+    worker_parser.add_argument('--lote', type=int, default=8, help="URLs tomadas en cada préstamo")
+    worker_parser.add_argument('--prestamo', type=int, default=60, help="Segundos de cada préstamo")
+    worker_parser.add_argument('--modo', default='auto', choices=WebScrapingRealRPA.FETCH_MODES)
+    worker_parser.add_argument('--navegadores', type=int, default=1, help="Tamaño del pool de Chrome")
+    worker_parser.add_argument('--espera-maxima', type=float, default=None,
+                               help="Segundos sin trabajo antes de terminar (por defecto, al vaciarse la cola)")
+    worker_parser.set_defaults(func=run_worker)
+
+    status_parser = commands.add_parser('estado', parents=[common], help="Muestra trabajos y workers")
+    status_parser.set_defaults(func=show_status)
+
+    export_parser = commands.add_parser('exportar', parents=[common], help="Escribe los resultados en un fichero")
+    export_parser.add_argument('--salida', default='resultados_distribuidos.jsonl',
+                               help="Fichero .jsonl, .csv, .parquet o .xlsx")
+    export_parser.set_defaults(func=export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,49 +10,2375 @@ Este script hace web scraping REAL de sitios web HTML:
 
 import time
 import pandas as pd
+import numpy as np
 import platform
 import os
+import math
+import csv
+import json
+import hashlib
+import sqlite3
+import asyncio
+import queue
+import pickle
+import multiprocessing
+from array import array
+import threading
+from contextlib import contextmanager
+from collections import Counter
+from collections.abc import Mapping
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException, TimeoutException, InvalidSessionIdException
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import builder_registry
+import soupsieve
 import requests
+from requests.adapters import HTTPAdapter
 import random
+import re
+import codecs
 from datetime import datetime
+from openpyxl import Workbook
+from urllib.parse import urlsplit, urlunsplit, urljoin, urlencode, parse_qsl
+from urllib.robotparser import RobotFileParser
 
-class WebScrapingRealRPA:
+
+# Recursos que el perfil de rendimiento bloquea vía CDP (imágenes, fuentes, multimedia)
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.ogg', '*.mp3', '*.wav', '*.m3u8',
+]
+
+# Dominios de analítica y publicidad que no aportan contenido al scraping
+TRACKING_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'googlesyndication.com',
+    'doubleclick.net', 'facebook.net', 'connect.facebook.net', 'hotjar.com',
+    'segment.io', 'segment.com', 'mixpanel.com', 'newrelic.com', 'nr-data.net',
+    'scorecardresearch.com', 'criteo.com', 'taboola.com', 'outbrain.com',
+]
+
+# Flags que evitan trabajo de fondo de Chrome que no sirve para scraping
+LEAN_CHROME_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--blink-settings=imagesEnabled=false',
+    '--mute-audio',
+    '--no-first-run',
+]
+
+
+def apply_resource_blocking(driver):
+    """Bloquea imágenes, fuentes, multimedia y trackers en la pestaña actual (CDP)"""
+    patterns = BLOCKED_RESOURCE_PATTERNS + [f"*{domain}*" for domain in TRACKING_DOMAINS]
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def create_chrome_driver(performance_profile=False, page_load_strategy='normal', page_load_timeout=30):
+    """
+    Crea una instancia de Chrome headless lista para web scraping.
+    
+    Con `performance_profile` se usa un perfil ligero: sin extensiones ni
+    tráfico de fondo y sin descargar imágenes, fuentes, multimedia ni
+    trackers. `page_load_strategy='eager'` devuelve el control en cuanto el
+    DOM está listo, sin esperar a subrecursos.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.page_load_strategy = page_load_strategy
+    
+    if performance_profile:
+        for argument in LEAN_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.media_stream': 2,
+            'profile.managed_default_content_settings.plugins': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+    
+    # Configuración específica para macOS
+    if platform.system() == "Darwin":
+        chrome_paths = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            "/Applications/Chromium.app/Contents/MacOS/Chromium"
+        ]
+        for path in chrome_paths:
+            if os.path.exists(path):
+                options.binary_location = path
+                break
+    
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+    if performance_profile:
+        apply_resource_blocking(driver)
+    return driver
+
+
+def create_http_session(pool_size=32):
+    """Crea una sesión HTTP con conexiones keep-alive reutilizables y compresión"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (RPA Knowledge Web Scraper)',
+        'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+        'Accept-Encoding': 'gzip, deflate',
+    })
+    return session
+
+
+# <meta charset=...> o <meta http-equiv content="...; charset=..."> al inicio del HTML
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([a-zA-Z0-9_\-]+)', re.IGNORECASE)
+
+
+def declared_charset(content, head_bytes=2048):
+    """Charset declarado en <meta> al principio del documento, o None"""
+    match = _META_CHARSET_RE.search(content[:head_bytes])
+    if not match:
+        return None
+    charset = match.group(1).decode('ascii')
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return None
+    return charset
+
+
+# Pistas de que una página se construye con JavaScript y necesita navegador
+_SPA_ROOT_RE = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>', re.IGNORECASE
+)
+_NOSCRIPT_RE = re.compile(
+    r'<noscript[^>]*>[^<]*(?:enable|habilita|activa)[^<]*javascript', re.IGNORECASE
+)
+_NON_VISIBLE_RE = re.compile(r'<(script|style)[^>]*>.*?</\1>|<[^>]+>', re.IGNORECASE | re.DOTALL)
+
+
+def needs_javascript(html, min_text_length=200):
+    """Heurística rápida para decidir si el HTML estático está incompleto sin JavaScript"""
+    if _SPA_ROOT_RE.search(html) or _NOSCRIPT_RE.search(html):
+        return True
+    if '<script' in html.lower():
+        visible_text = _NON_VISIBLE_RE.sub(' ', html)
+        return len(' '.join(visible_text.split())) < min_text_length
+    return False
+
+
+# Backends de BeautifulSoup soportados, del más rápido al más lento
+PARSER_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+
+def resolve_parser(parser='auto'):
+    """
+    Devuelve el backend de parseo a usar.
+    
+    'auto' elige lxml (C, el más rápido) si está instalado. Si el backend
+    pedido no está disponible se usa html.parser, que viene con Python.
+    """
+    if parser == 'auto':
+        return 'lxml' if builder_registry.lookup('lxml') else 'html.parser'
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"Parser no soportado: {parser}")
+    if not builder_registry.lookup(parser):
+        print(f"⚠️ Parser '{parser}' no instalado, usando html.parser")
+        return 'html.parser'
+    return parser
+
+
+# Etiqueta de la columna 'Navegador' según cómo se descargó la página
+FETCH_LABELS = {
+    'browser': 'Chrome (Web Scraping Real)',
+    'http': 'HTTP directo (requests)',
+}
+
+
+class FetchResult:
+    """
+    Resultado de descargar una página: HTML y cómo se obtuvo.
+    
+    Con extracción en el navegador no hay HTML: `values` trae los campos
+    del esquema ya extraídos y `links` los href de la página.
+    """
+    
+    def __init__(self, url, html, via, status_code=None, from_cache=False, not_modified=False,
+                 values=None, links=None):
+        self.url = url
+        self.html = html
+        self.via = via  # 'http' o 'browser'
+        self.status_code = status_code
+        self.from_cache = from_cache
+        self.not_modified = not_modified  # El contenido no cambió desde la última descarga
+        self.values = values
+        self.links = links
+    
+    @property
+    def content(self):
+        """Contenido del que se calcula la huella: el HTML o los campos extraídos"""
+        if self.html is not None:
+            return self.html
+        return json.dumps(self.values, ensure_ascii=False, sort_keys=True)
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class StageTimer:
+    """
+    Mide cuánto tarda cada etapa del scraping (arranque del navegador,
+    navegación, espera, page_source, descarga HTTP, parseo, extracción,
+    escritura...), agrupado por etapa y host, y se puede exportar a JSON o
+    Prometheus.
+    
+    La memoria es fija por (etapa, host) aunque el crawl dure horas: número,
+    suma y máximo exactos, y los percentiles sobre una muestra uniforme de
+    `reservoir_size` duraciones (muestreo de reservorio). Con `keep_spans`
+    se guardan además todos los tramos con su instante de inicio.
+    """
+    
+    def __init__(self, reservoir_size=1024, keep_spans=False):
+        self.reservoir_size = reservoir_size
+        self.keep_spans = keep_spans
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._spans = {}
+    
+    @contextmanager
+    def span(self, stage, host=''):
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, host, started_at, time.perf_counter() - start)
+    
+    def record(self, stage, host, started_at, duration):
+        with self._lock:
+            self._add(stage, host, duration)
+            if self.keep_spans:
+                self._spans.setdefault((stage, host), []).append((started_at, duration))
+    
+    def _add(self, stage, host, duration, count=1, total=None):
+        """Suma `count` medidas (con su total) y ofrece `duration` al reservorio"""
+        stats = self._stats.get((stage, host))
+        if stats is None:
+            stats = self._stats[(stage, host)] = {'count': 0, 'total': 0.0, 'max': 0.0, 'samples': []}
+        stats['count'] += count
+        stats['total'] += duration if total is None else total
+        stats['max'] = max(stats['max'], duration)
+        samples = stats['samples']
+        if len(samples) < self.reservoir_size:
+            samples.append(duration)
+        else:
+            index = random.randrange(stats['count'])
+            if index < self.reservoir_size:
+                samples[index] = duration
+    
+    def snapshot(self):
+        """Copia de las medidas, para enviarla entre procesos"""
+        with self._lock:
+            stats = {key: dict(values, samples=list(values['samples'])) for key, values in self._stats.items()}
+            spans = {key: list(values) for key, values in self._spans.items()}
+        return {'stats': stats, 'spans': spans}
+    
+    def merge(self, snapshot):
+        """
+        Agrega las medidas de otro StageTimer (p. ej. en un worker). Si las
+        muestras del otro están completas la fusión es exacta; si no, los
+        percentiles quedan aproximados.
+        """
+        with self._lock:
+            for (stage, host), stats in snapshot['stats'].items():
+                samples = stats['samples']
+                if len(samples) == stats['count']:
+                    for duration in samples:
+                        self._add(stage, host, duration)
+                    continue
+                # Muestra parcial: cada muestra representa a una parte de las medidas
+                size = len(samples)
+                for i, duration in enumerate(samples):
+                    count = stats['count'] * (i + 1) // size - stats['count'] * i // size
+                    self._add(stage, host, duration, count=count, total=0.0)
+                own = self._stats[(stage, host)]
+                own['total'] += stats['total']
+                own['max'] = max(own['max'], stats['max'])
+            if self.keep_spans:
+                for key, values in snapshot['spans'].items():
+                    self._spans.setdefault(key, []).extend(values)
+    
+    def summary(self):
+        """{etapa: {host: {count, total, p50, p95, max}}} en segundos"""
+        stats = self.snapshot()['stats']
+        summary = {}
+        for (stage, host), values in sorted(stats.items()):
+            durations = sorted(values['samples'])
+            summary.setdefault(stage, {})[host] = {
+                'count': values['count'],
+                'total': values['total'],
+                'p50': percentile(durations, 0.50),
+                'p95': percentile(durations, 0.95),
+                'max': values['max'],
+            }
+        return summary
+    
+    def export_json(self, path, include_spans=False):
+        data = {'generated_at': time.time(), 'stages': self.summary()}
+        if include_spans:
+            if not self.keep_spans:
+                raise ValueError("Los tramos individuales solo se guardan con StageTimer(keep_spans=True)")
+            data['spans'] = [
+                {'stage': stage, 'host': host, 'start': started_at, 'duration': duration}
+                for (stage, host), values in self.snapshot()['spans'].items()
+                for started_at, duration in values
+            ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    
+    def prometheus_text(self, metric='rpa_scraping_stage_seconds'):
+        """Resumen en formato de texto de Prometheus (tipo summary)"""
+        lines = [
+            f"# HELP {metric} Duración de cada etapa del web scraping",
+            f"# TYPE {metric} summary",
+        ]
+        for stage, hosts in self.summary().items():
+            for host, stats in hosts.items():
+                labels = f'stage="{stage}",host="{host}"'
+                lines.append(f'{metric}{{{labels},quantile="0.5"}} {stats["p50"]:.6f}')
+                lines.append(f'{metric}{{{labels},quantile="0.95"}} {stats["p95"]:.6f}')
+                lines.append(f'{metric}_sum{{{labels}}} {stats["total"]:.6f}')
+                lines.append(f'{metric}_count{{{labels}}} {stats["count"]}')
+        return '\n'.join(lines) + '\n'
+    
+    def export_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+
+
+class CircuitOpenError(Exception):
+    """Se rechaza la petición porque el host tiene el circuito abierto"""
+
+
+class FetchPolicy:
+    """
+    Política de descarga: plazos de conexión y lectura separados y
+    reintentos con backoff exponencial y jitter para errores transitorios.
+    """
+    
+    # Códigos HTTP que suelen resolverse solos reintentando
+    RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+    # Errores de Selenium transitorios (plazos y sesión perdida); el resto
+    # (JavaScript, selector o argumento inválido...) fallaría igual al repetir
+    RETRY_WEBDRIVER_ERRORS = (TimeoutException, InvalidSessionIdException)
+    # Mensajes de WebDriverException genérica cuando se pierde la conexión con Chrome
+    _BROWSER_GONE_RE = re.compile(r'not reachable|disconnected|crashed|connection refused', re.IGNORECASE)
+    
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=10.0, jitter=0.5,
+                 connect_timeout=5, read_timeout=15):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+    
+    @property
+    def http_timeout(self):
+        """Tupla (conexión, lectura) en el formato de requests"""
+        return (self.connect_timeout, self.read_timeout)
+    
+    def backoff(self, attempt):
+        """Espera antes del reintento `attempt` (0, 1, 2...), con ±jitter aleatorio"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+    
+    def is_retryable(self, error):
+        if isinstance(error, requests.HTTPError):
+            return error.response is not None and error.response.status_code in self.RETRY_STATUSES
+        if isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError)):
+            return True
+        if isinstance(error, self.RETRY_WEBDRIVER_ERRORS):
+            return True
+        return (type(error) is WebDriverException
+                and bool(self._BROWSER_GONE_RE.search(error.msg or '')))
+
+
+class CircuitBreaker:
+    """
+    Cortocircuito por host.
+    
+    Tras `failure_threshold` fallos seguidos el host queda "abierto" durante
+    `reset_timeout` segundos y sus peticiones fallan al instante, sin ocupar
+    trabajadores. Pasado ese tiempo se deja pasar una petición de prueba:
+    si funciona el circuito se cierra, si falla vuelve a abrirse.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._opened_at = {}
+        self._probing = set()
+    
+    def before_request(self, host):
+        """
+        Lanza CircuitOpenError si el host no admite peticiones ahora.
+        Devuelve True si esta es la petición de prueba del circuito semiabierto
+        (quien la hace debe llamar a end_probe al terminar).
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return False
+            if time.monotonic() - opened_at < self.reset_timeout or host in self._probing:
+                raise CircuitOpenError(f"Circuito abierto para {host}, se omite la petición")
+            self._probing.add(host)  # Semiabierto: solo una petición de prueba
+            return True
+    
+    def end_probe(self, host):
+        """Libera la prueba si terminó sin veredicto (p. ej. un error no transitorio)"""
+        with self._lock:
+            self._probing.discard(host)
+    
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._probing.discard(host)
+    
+    def record_failure(self, host):
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if host in self._probing or self._failures[host] >= self.failure_threshold:
+                if host not in self._opened_at or host in self._probing:
+                    print(f"   🚫 Circuito abierto para {host} durante {self.reset_timeout}s")
+                self._opened_at[host] = time.monotonic()
+            self._probing.discard(host)
+    
+    def is_open(self, host):
+        with self._lock:
+            return host in self._opened_at
+
+
+class HttpResponseCache:
+    """
+    Caché en disco de respuestas HTTP con revalidación condicional.
+    
+    Cada entrada guarda el HTML y sus validadores (ETag / Last-Modified).
+    Durante `ttl` segundos la entrada se usa sin ir a la red; después se
+    revalida con un GET condicional y un 304 evita volver a descargarla.
+    Las entradas que superan `max_age` se descartan y, si la caché pasa de
+    `max_bytes`, se eliminan las usadas hace más tiempo.
+    
+    Cada entrada anota para qué tipos de sitio se ha servido su cuerpo, de
+    modo que solo cuenta como "sin cambios" lo ya servido para ese mismo
+    tipo en una ejecución anterior (no lo descargado en esta).
+    """
+    
+    # Cabeceras de la petición que cambian la respuesta y forman parte de la clave
+    VARY_HEADERS = ('Accept', 'Accept-Language', 'User-Agent')
+    
+    def __init__(self, directory='cache_http', ttl=3600, max_age=7 * 24 * 3600,
+                 max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.opened_at = time.time()  # Inicio de esta ejecución
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(
+            os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+        )
+    
+    def _key(self, url, headers):
+        vary = '|'.join(f"{name}={headers.get(name, '')}" for name in self.VARY_HEADERS)
+        return hashlib.sha256(f"{url}|{vary}".encode('utf-8')).hexdigest()
+    
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.html'
+    
+    def lookup(self, url, headers):
+        """Devuelve los metadatos de la entrada de `url`, o None"""
+        meta_path, _ = self._paths(self._key(url, headers))
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry['stored_at'] > self.max_age:
+            self._delete(entry['key'])
+            return None
+        os.utime(meta_path)  # La fecha de modificación marca el último uso (para evict)
+        return entry
+    
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+    
+    def validators(self, entry):
+        """Cabeceras para un GET condicional"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def read_body(self, entry):
+        _, body_path = self._paths(entry['key'])
+        with open(body_path, encoding='utf-8') as f:
+            return f.read()
+    
+    def seen_before(self, entry, site_type):
+        """
+        Indica si el cuerpo de la entrada ya se sirvió para `site_type` en una
+        ejecución anterior, y anota que se sirve en esta.
+        """
+        served = entry.setdefault('served', {})
+        first_served = served.get(site_type or '')
+        if first_served is None:
+            served[site_type or ''] = time.time()
+            self._write_meta(entry)
+            return False
+        return first_served < self.opened_at
+    
+    def refresh(self, entry):
+        """Marca como fresca una entrada revalidada con un 304"""
+        entry['stored_at'] = time.time()
+        self._write_meta(entry)
+    
+    def store(self, url, headers, response, site_type=None):
+        """Guarda una respuesta 200 (salvo que el servidor pida no almacenarla)"""
+        if 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return
+        key = self._key(url, headers)
+        _, body_path = self._paths(key)
+        body = response.text.encode('utf-8')
+        self._delete(key)
+        self._atomic_write(body_path, body)
+        with self._lock:
+            self._total_bytes += len(body)
+        entry = {
+            'key': key,
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'stored_at': time.time(),
+        }
+        entry['served'] = {site_type or '': entry['stored_at']}
+        self._write_meta(entry)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+    
+    def evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta caber en `max_bytes`"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                path = os.path.join(self.directory, name)
+                entries.append((os.path.getmtime(path), name[:-len('.json')]))
+        for _, key in sorted(entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._delete(key)
+    
+    def _write_meta(self, entry):
+        meta_path, _ = self._paths(entry['key'])
+        data = json.dumps(entry).encode('utf-8')
+        previous = os.path.getsize(meta_path) if os.path.exists(meta_path) else 0
+        self._atomic_write(meta_path, data)
+        with self._lock:
+            self._total_bytes += len(data) - previous
+    
+    def _atomic_write(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def _delete(self, key):
+        for path in self._paths(key):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            with self._lock:
+                self._total_bytes -= size
+
+
+class BrowserStartError(WebDriverException):
+    """No se pudo arrancar un navegador para el pool"""
+
+
+class BrowserContext:
+    """
+    Contexto aislado (tipo incógnito) dentro de un Chrome ya arrancado.
+    
+    Se crea con CDP `Target.createBrowserContext` y una pestaña propia a la
+    que se cambia el driver; cookies, localStorage y caché pertenecen al
+    contexto y desaparecen al cerrarlo. Da el aislamiento de un navegador
+    nuevo por trabajo sin el coste de arrancar otro proceso de Chrome.
+    
+    Si el navegador no admite CDP, al cerrar se borran cookies y
+    almacenamiento de la pestaña actual.
+    """
+    
+    def __init__(self, driver, on_open=None):
+        self.driver = driver
+        self.on_open = on_open  # Configuración por pestaña (p. ej. bloqueo de recursos)
+        self.base_handle = None
+        self.context_id = None
+        self.target_id = None
+    
+    def open(self):
+        self.base_handle = self.driver.current_window_handle
+        try:
+            self.context_id = self.driver.execute_cdp_cmd('Target.createBrowserContext', {})['browserContextId']
+            self.target_id = self.driver.execute_cdp_cmd('Target.createTarget', {
+                'url': 'about:blank',
+                'browserContextId': self.context_id,
+            })['targetId']
+        except (AttributeError, WebDriverException):
+            if self.context_id is None:
+                return  # Sin CDP: se limpia el estado al cerrar
+            raise
+        # chromedriver usa el id del target como identificador de ventana
+        self.driver.switch_to.window(self.target_id)
+        if self.on_open:
+            self.on_open(self.driver)
+    
+    def close(self):
+        if self.context_id is None:
+            self.driver.delete_all_cookies()
+            self.driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            return
+        if self.target_id is not None:
+            self.driver.execute_cdp_cmd('Target.closeTarget', {'targetId': self.target_id})
+        self.driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': self.context_id})
+        self.driver.switch_to.window(self.base_handle)
+
+
+class ChromeDriverPool:
+    """
+    Pool de navegadores Chrome reutilizables.
+    
+    Arrancar Chrome cuesta varios segundos, así que los navegadores se crean
+    bajo demanda (hasta `size`) y se prestan una y otra vez. Antes de cada
+    préstamo se comprueba que el navegador siga respondiendo, y después de
+    `max_pages_per_driver` páginas se recicla para evitar fugas de memoria.
+    
+    Con `isolate_contexts` cada préstamo trabaja en un BrowserContext nuevo,
+    así que los trabajos no comparten cookies ni almacenamiento aunque usen
+    el mismo proceso de Chrome. `context_setup` se aplica a cada pestaña
+    nueva. Un mismo pool puede compartirse entre varios bots (scraping y
+    formularios); cada uno decide su aislamiento con borrow(isolate=...).
+    """
+    
+    def __init__(self, size=1, max_pages_per_driver=50, driver_factory=create_chrome_driver, timer=None,
+                 isolate_contexts=False, context_setup=None):
+        self.size = max(1, size)
+        self.max_pages_per_driver = max_pages_per_driver
+        self.driver_factory = driver_factory
+        self.timer = timer or StageTimer()
+        self.isolate_contexts = isolate_contexts
+        self.context_setup = context_setup
+        self._idle = []  # LIFO: se reutiliza primero el navegador más "caliente"
+        self._pages = {}
+        self._created = 0
+        # Protege _idle y _created y despierta a quien espera cuando se
+        # devuelve un navegador o se libera un hueco (reciclado o roto)
+        self._available = threading.Condition()
+        self._closed = False
+    
+    def _create_driver(self):
+        """Arranca un navegador nuevo (cuenta contra el tamaño del pool)"""
+        print("🔧 Iniciando Google Chrome para el pool de navegadores...")
+        try:
+            with self.timer.span('arranque_navegador'):
+                driver = self.driver_factory()
+        except Exception as e:
+            self._free_slot()
+            raise BrowserStartError(f"No se pudo iniciar Chrome: {e}") from e
+        self._pages[id(driver)] = 0
+        print("✅ Google Chrome listo en el pool")
+        return driver
+    
+    def _discard(self, driver):
+        """Cierra un navegador y libera su hueco en el pool"""
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._free_slot()
+    
+    def _free_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+    
+    def is_healthy(self, driver):
+        """Comprueba que el navegador siga vivo y respondiendo"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+    
+    def acquire(self, timeout=None):
+        """
+        Obtiene un navegador sano del pool, creando uno si hay hueco. Si no
+        hay ninguno libre espera hasta `timeout` segundos (queue.Empty).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("El pool de navegadores está cerrado")
+                    if self._idle:
+                        driver = self._idle.pop()
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        driver = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    self._available.wait(remaining)
+            
+            if driver is None:
+                return self._create_driver()
+            if self.is_healthy(driver):
+                return driver
+            print("⚠️ Navegador del pool sin respuesta, reemplazándolo...")
+            self._discard(driver)
+    
+    def release(self, driver, broken=False):
+        """Devuelve un navegador al pool, reciclándolo si hace falta"""
+        pages = self._pages.get(id(driver), 0) + 1
+        self._pages[id(driver)] = pages
+        
+        if broken or self._closed:
+            self._discard(driver)
+        elif self.max_pages_per_driver and pages >= self.max_pages_per_driver:
+            print(f"♻️ Reciclando navegador tras {pages} páginas")
+            self._discard(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+    
+    @contextmanager
+    def borrow(self, timeout=None, isolate=None):
+        """
+        Presta un navegador durante un bloque `with`. Con `isolate` (por
+        defecto el `isolate_contexts` del pool) trabaja en un contexto aislado.
+        """
+        isolate = self.isolate_contexts if isolate is None else isolate
+        driver = self.acquire(timeout=timeout)
+        broken = False
+        context = BrowserContext(driver, self.context_setup) if isolate else None
+        try:
+            if context:
+                with self.timer.span('contexto_navegador'):
+                    context.open()
+            yield driver
+        except WebDriverException:
+            broken = not self.is_healthy(driver)
+            raise
+        finally:
+            if context and not broken:
+                try:
+                    context.close()
+                except WebDriverException:
+                    # Un contexto que no se puede cerrar deja el navegador en estado dudoso
+                    broken = True
+            self.release(driver, broken=broken)
+    
+    def close(self):
+        """Cierra todos los navegadores inactivos del pool"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for driver in idle:
+            self._discard(driver)
+        if idle:
+            print(f"🔒 {len(idle)} navegador(es) Chrome cerrado(s)")
+
+
+# Selectores formados solo por nombres de etiqueta ("p", "h1, h2") se resuelven
+# comparando el nombre del elemento, sin pasar por el motor CSS
+_TAG_LIST_RE = re.compile(r'^\s*[a-zA-Z][a-zA-Z0-9]*(\s*,\s*[a-zA-Z][a-zA-Z0-9]*)*\s*$')
+
+
+class SchemaField:
+    """Campo compilado de un esquema: selector CSS o XPath y límite de resultados"""
+    
+    def __init__(self, name, spec):
+        if isinstance(spec, str):
+            spec = {'css': spec, 'limit': 1}
+        if ('css' in spec) == ('xpath' in spec):
+            raise ValueError(f"El campo '{name}' necesita un selector 'css' o 'xpath'")
+        self.name = name
+        self.limit = spec.get('limit')
+        self.css = spec.get('css')
+        self.xpath = spec.get('xpath')
+        self.tag_names = None
+        self.pattern = None
+        
+        if self.css:
+            if _TAG_LIST_RE.match(self.css):
+                self.tag_names = frozenset(tag.strip().lower() for tag in self.css.split(','))
+            else:
+                self.pattern = soupsieve.compile(self.css)
+        else:
+            from lxml import etree
+            self.pattern = etree.XPath(self.xpath)
+    
+    def browser_spec(self):
+        """Definición del campo para el script de extracción en el navegador"""
+        return {'name': self.name, 'css': self.css, 'xpath': self.xpath, 'limit': self.limit}
+    
+    def matches(self, element):
+        if self.tag_names is not None:
+            return element.name in self.tag_names
+        return self.pattern.match(element)
+
+
+# Script que aplica los campos de un esquema en el navegador y devuelve solo
+# los textos extraídos: {values: {campo: [[etiqueta, texto], ...]}, links: [...]}
+BROWSER_EXTRACT_SCRIPT = """
+const [fields, linkSelector] = arguments;
+const values = {};
+for (const field of fields) {
+    let nodes = [];
+    if (field.css) {
+        nodes = Array.from(document.querySelectorAll(field.css));
+    } else {
+        const snapshot = document.evaluate(field.xpath, document, null,
+                                           XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < snapshot.snapshotLength; i++) {
+            nodes.push(snapshot.snapshotItem(i));
+        }
+    }
+    if (field.limit !== null) {
+        nodes = nodes.slice(0, field.limit);
+    }
+    values[field.name] = nodes.map(node => node.nodeType === Node.ELEMENT_NODE
+        ? [node.tagName.toLowerCase(), node.textContent.trim()]
+        : ['text', (node.nodeValue || '').trim()]);
+}
+const links = linkSelector
+    ? Array.from(document.querySelectorAll(linkSelector), anchor => anchor.getAttribute('href') || '')
+    : [];
+return {values: values, links: links};
+"""
+
+
+class ExtractionSchema:
+    """
+    Esquema declarativo de extracción para un sitio.
+    
+    Mapea nombres de campo a selectores y se compila una sola vez. Todos los
+    campos CSS se resuelven en un único recorrido del documento.
+    
+    Un esquema con campos XPath (requieren lxml) trabaja sobre un único
+    árbol lxml en lugar de BeautifulSoup (ver parse()), así que la página se
+    parsea una sola vez. En ese caso los campos CSS solo pueden ser nombres
+    de etiqueta ('h1', 'h2, h3'), que se resuelven en el mismo árbol.
+    
+    Formato de cada campo:
+    - 'h1'                                  -> primer elemento que coincide
+    - {'css': 'p', 'limit': 5}              -> hasta 5 elementos (None = todos)
+    - {'xpath': '//div[@class="precio"]'}   -> selector XPath
+    """
+    
+    def __init__(self, name, fields):
+        self.name = name
+        self.spec = fields  # Definición original, para registrar el sitio en otros procesos
+        self.fields = [SchemaField(field_name, spec) for field_name, spec in fields.items()]
+        self.css_fields = [field for field in self.fields if field.css]
+        self.xpath_fields = [field for field in self.fields if field.xpath]
+        self.browser_fields = [field.browser_spec() for field in self.fields]
+        self.uses_lxml = bool(self.xpath_fields)
+        if self.uses_lxml:
+            mixed = [field.name for field in self.css_fields if field.tag_names is None]
+            if mixed:
+                raise ValueError(
+                    f"El esquema '{name}' mezcla XPath con selectores CSS complejos ({', '.join(mixed)}); "
+                    f"usa XPath o solo nombres de etiqueta en esos campos"
+                )
+    
+    def parse(self, html, parser='html.parser'):
+        """Parsea la página en el formato que usa extract(): árbol lxml o BeautifulSoup"""
+        if self.uses_lxml:
+            from lxml import etree, html as lxml_html
+            try:
+                return lxml_html.fromstring(html)
+            except etree.ParserError:
+                # Documento vacío o solo espacios: sin campos (como BeautifulSoup),
+                # y sin un error que no se puede enviar entre procesos
+                return lxml_html.Element('html')
+        return BeautifulSoup(html, parser)
+    
+    def extract_in_browser(self, driver, link_selector=None):
+        """
+        Ejecuta los selectores dentro del navegador con execute_script.
+        
+        Solo viajan por WebDriver los textos de los campos (y los href de
+        `link_selector`, si se pide), no el DOM serializado completo.
+        Devuelve (valores, enlaces) con el mismo formato que extract().
+        """
+        payload = driver.execute_script(BROWSER_EXTRACT_SCRIPT, self.browser_fields, link_selector)
+        values = {name: [tuple(item) for item in items] for name, items in payload['values'].items()}
+        return values, payload['links']
+    
+    def extract(self, soup, html=None):
+        """
+        Devuelve {campo: [(etiqueta, texto), ...]} en orden de documento.
+        `soup` es el documento de parse(); con un BeautifulSoup y un esquema
+        XPath se vuelve a parsear `html` con lxml.
+        """
+        if self.uses_lxml:
+            if isinstance(soup, Tag) or soup is None:
+                soup = self.parse(html if html is not None else str(soup))
+            return self._extract_tree(soup)
+        
+        values = {field.name: [] for field in self.fields}
+        pending = list(self.css_fields)
+        
+        if pending:
+            for element in soup.descendants:
+                if not isinstance(element, Tag):
+                    continue
+                text = None
+                for field in pending:
+                    if field.matches(element):
+                        if text is None:
+                            text = element.get_text().strip()
+                        values[field.name].append((element.name, text))
+                if text is not None:
+                    pending = [
+                        field for field in pending
+                        if field.limit is None or len(values[field.name]) < field.limit
+                    ]
+                    if not pending:
+                        break  # Todos los campos completos: no hace falta seguir
+        
+        return values
+    
+    def _extract_tree(self, tree):
+        """extract() sobre un árbol lxml: etiquetas en un recorrido y XPath sobre el mismo árbol"""
+        values = {field.name: [] for field in self.fields}
+        pending = list(self.css_fields)
+        
+        if pending:
+            for element in tree.iter():
+                if not isinstance(element.tag, str):
+                    continue  # Comentarios e instrucciones de procesamiento
+                text = None
+                for field in pending:
+                    if element.tag in field.tag_names:
+                        if text is None:
+                            text = element.text_content().strip()
+                        values[field.name].append((element.tag, text))
+                if text is not None:
+                    pending = [
+                        field for field in pending
+                        if field.limit is None or len(values[field.name]) < field.limit
+                    ]
+                    if not pending:
+                        break
+        
+        for field in self.xpath_fields:
+            for element in field.pattern(tree)[:field.limit]:
+                if isinstance(element, str):
+                    values[field.name].append(('text', element.strip()))
+                else:
+                    values[field.name].append((element.tag, element.text_content().strip()))
+        
+        return values
+
+
+# Columnas de salida en orden estable (CSV, Parquet y Excel necesitan cabecera fija)
+RECORD_COLUMNS = [
+    'Título', 'Enlace', 'Puntuación', 'Precio', 'Categoría', 'Empresa', 'Ubicación',
+    'Salario', 'Navegador', 'Fecha_Extracción', 'Tipo', 'Campo', 'Contenido', 'Elementos_HTML'
+]
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class PageInfo:
+    """
+    Campos comunes a todos los registros de una página (Enlace, Navegador y
+    fecha de extracción). Se guardan una sola vez y los registros de la
+    página comparten la misma instancia; la fecha es un entero (epoch) y
+    solo se formatea al escribir la salida.
+    """
+    
+    __slots__ = ('url', 'navegador', 'extracted_at', '_fecha')
+    
+    def __init__(self, url, navegador, extracted_at=None):
+        self.url = url
+        self.navegador = navegador
+        self.extracted_at = int(time.time()) if extracted_at is None else extracted_at
+        self._fecha = None
+    
+    @property
+    def fecha(self):
+        if self._fecha is None:
+            self._fecha = datetime.fromtimestamp(self.extracted_at).strftime(DATE_FORMAT)
+        return self._fecha
+
+
+class ScrapedRecord(Mapping):
+    """
+    Registro extraído compacto (__slots__ en lugar de un dict por fila).
+    
+    Se lee como un dict de solo lectura con los nombres de columna de
+    RECORD_COLUMNS (record['Título'], record.get('Precio')), así que sinks,
+    estado incremental y prints no distinguen entre ambos. Las columnas
+    sin valor no aparecen, igual que las claves ausentes de un dict.
+    """
+    
+    __slots__ = ('page', 'title', 'score', 'price', 'category', 'company', 'location',
+                 'salary', 'kind', 'field', 'content', 'html_tag', 'extra')
+    
+    # Columna -> atributo propio del registro
+    ATTRIBUTES = {
+        'Título': 'title', 'Puntuación': 'score', 'Precio': 'price', 'Categoría': 'category',
+        'Empresa': 'company', 'Ubicación': 'location', 'Salario': 'salary', 'Tipo': 'kind',
+        'Campo': 'field', 'Contenido': 'content', 'Elementos_HTML': 'html_tag',
+    }
+    # Columnas que salen de la página compartida
+    PAGE_COLUMNS = {'Enlace': 'url', 'Navegador': 'navegador', 'Fecha_Extracción': 'fecha'}
+    
+    def __init__(self, page, title, kind, content, html_tag, score=None, price=None, category=None,
+                 company=None, location=None, salary=None, field=None, extra=None):
+        self.page = page
+        self.title = title
+        self.kind = kind
+        self.content = content
+        self.html_tag = html_tag
+        self.score = score
+        self.price = price
+        self.category = category
+        self.company = company
+        self.location = location
+        self.salary = salary
+        self.field = field
+        self.extra = extra  # Columnas adicionales de constructores propios
+    
+    @classmethod
+    def from_mapping(cls, record):
+        """Convierte un registro dict (p. ej. de un constructor registrado) al formato compacto"""
+        if isinstance(record, cls):
+            return record
+        fecha = record.get('Fecha_Extracción')
+        try:
+            extracted_at = int(datetime.strptime(fecha, DATE_FORMAT).timestamp()) if fecha else None
+        except (TypeError, ValueError):
+            extracted_at = None
+        page = PageInfo(record.get('Enlace'), record.get('Navegador'), extracted_at)
+        values = {attribute: record.get(column) for column, attribute in cls.ATTRIBUTES.items()}
+        extra = {key: value for key, value in record.items()
+                 if key not in cls.ATTRIBUTES and key not in cls.PAGE_COLUMNS}
+        return cls(page, extra=extra or None, **values)
+    
+    def __getitem__(self, column):
+        attribute = self.ATTRIBUTES.get(column)
+        if attribute is not None:
+            value = getattr(self, attribute)
+        elif column in self.PAGE_COLUMNS:
+            value = getattr(self.page, self.PAGE_COLUMNS[column])
+        elif self.extra and column in self.extra:
+            return self.extra[column]
+        else:
+            raise KeyError(column)
+        if value is None:
+            raise KeyError(column)
+        return value
+    
+    def __iter__(self):
+        for column in RECORD_COLUMNS:
+            if column in self:
+                yield column
+        if self.extra:
+            yield from self.extra
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def __repr__(self):
+        return f"ScrapedRecord({dict(self)!r})"
+
+
+class RecordTable:
+    """
+    Registros en memoria guardados por columnas.
+    
+    Cada columna es una lista y los campos comunes de la página (Enlace,
+    Navegador, fecha) se guardan una vez por página: cada fila solo guarda
+    el índice entero de su página. El DataFrame se construye directamente
+    desde las columnas, sin pasar por un dict por registro.
+    """
+    
     def __init__(self):
+        self._pages = []
+        self._page_rows = {}  # id(PageInfo) -> índice en _pages
+        self._page_codes = array('q')  # Índice de página de cada fila
+        self._columns = {attribute: [] for attribute in ScrapedRecord.ATTRIBUTES.values()}
+        self._extra = {}  # Columnas adicionales: {columna: {fila: valor}}
+    
+    def append(self, record):
+        record = ScrapedRecord.from_mapping(record)
+        # _pages mantiene vivas las páginas, así que su id() no se reutiliza
+        code = self._page_rows.get(id(record.page))
+        if code is None:
+            code = self._page_rows[id(record.page)] = len(self._pages)
+            self._pages.append(record.page)
+        self._page_codes.append(code)
+        for attribute, values in self._columns.items():
+            values.append(getattr(record, attribute))
+        if record.extra:
+            for column, value in record.extra.items():
+                self._extra.setdefault(column, {})[len(self._page_codes) - 1] = value
+    
+    def __len__(self):
+        return len(self._page_codes)
+    
+    def __iter__(self):
+        for row, code in enumerate(self._page_codes):
+            values = {attribute: values[row] for attribute, values in self._columns.items()}
+            extra = {column: cells[row] for column, cells in self._extra.items() if row in cells}
+            yield ScrapedRecord(self._pages[code], extra=extra or None, **values)
+    
+    def to_dataframe(self):
+        """DataFrame con las columnas que tienen algún valor, en el orden de RECORD_COLUMNS"""
+        codes = np.frombuffer(self._page_codes, dtype=np.int64)
+        columns = {}
+        for column in RECORD_COLUMNS:
+            if column in ScrapedRecord.PAGE_COLUMNS:
+                attribute = ScrapedRecord.PAGE_COLUMNS[column]
+                per_page = [getattr(page, attribute) for page in self._pages]
+                if per_page.count(None) < len(per_page):
+                    columns[column] = np.array(per_page, dtype=object)[codes]
+            else:
+                values = self._columns[ScrapedRecord.ATTRIBUTES[column]]
+                if values.count(None) < len(values):
+                    columns[column] = np.array(values, dtype=object)
+        for column, cells in self._extra.items():
+            columns[column] = np.array([cells.get(row) for row in range(len(self))], dtype=object)
+        # dtype=object evita que pandas inspeccione cada columna para inferir su tipo
+        return pd.DataFrame(columns, dtype=object)
+
+
+# Listas usadas para simular ofertas de trabajo a partir del contenido real
+JOB_TITLES = [
+    "Desarrollador Python Senior",
+    "Ingeniero de Datos",
+    "Analista de Negocios",
+    "Diseñador UX/UI",
+    "DevOps Engineer",
+    "Product Manager",
+    "Data Scientist",
+    "Frontend Developer"
+]
+
+COMPANIES = [
+    "TechCorp",
+    "DataSolutions",
+    "InnovateLab",
+    "DigitalWorks",
+    "FutureTech",
+    "SmartSystems",
+    "CloudFirst",
+    "AICenter"
+]
+
+
+def build_news_records(values, url, navegador):
+    """Convierte los campos del esquema de noticias en registros"""
+    page = PageInfo(url, navegador)
+    records = []
+    
+    # Crear datos basados en contenido HTML real
+    for _, text in values['titulo']:
+        records.append(ScrapedRecord(
+            page,
+            title=f"Noticia Principal: {text}",
+            kind='Noticia Principal',
+            content=text,
+            html_tag='title',
+            score=f"{random.randint(80, 100)}% relevancia"
+        ))
+    
+    for _, text in values['encabezado']:
+        records.append(ScrapedRecord(
+            page,
+            title=f"Encabezado Principal: {text}",
+            kind='Encabezado Principal',
+            content=text,
+            html_tag='h1',
+            score=f"{random.randint(85, 100)}% relevancia"
+        ))
+    
+    # Párrafos como noticias
+    for i, (_, text) in enumerate(values['parrafos'], 1):
+        if text:
+            records.append(ScrapedRecord(
+                page,
+                title=f"Noticia {i}: {text[:50]}...",
+                kind='Párrafo de Noticia',
+                content=text,
+                html_tag='p',
+                score=f"{random.randint(60, 95)}% relevancia"
+            ))
+    
+    # Encabezados secundarios
+    for i, (_, text) in enumerate(values['secciones'], 1):
+        if text:
+            records.append(ScrapedRecord(
+                page,
+                title=f"Sección {i}: {text}",
+                kind='Sección',
+                content=text,
+                html_tag='h2',
+                score=f"{random.randint(70, 90)}% relevancia"
+            ))
+    
+    return records
+
+
+def build_ecommerce_records(values, url, navegador):
+    """Convierte los campos del esquema de e-commerce en productos simulados"""
+    page = PageInfo(url, navegador)
+    records = []
+    
+    # Simular productos basados en elementos encontrados
+    # En un sitio real el esquema apuntaría a .product-title, .price, etc.
+    for i, (tag, text) in enumerate(values['productos'], 1):
+        if len(text) > 10:
+            # Simular datos de producto
+            product_name = text[:30]
+            price = f"${random.randint(10, 1000)}.{random.randint(10, 99)}"
+            category = random.choice(['Electrónicos', 'Ropa', 'Hogar', 'Deportes'])
+            
+            records.append(ScrapedRecord(
+                page,
+                title=f"Producto {i}: {product_name}",
+                kind='Producto E-commerce',
+                content=text,
+                html_tag=tag,
+                price=price,
+                category=category
+            ))
+    
+    return records
+
+
+def build_job_records(values, url, navegador):
+    """Convierte los campos del esquema de empleos en ofertas simuladas"""
+    page = PageInfo(url, navegador)
+    records = []
+    
+    # Simular ofertas de trabajo basadas en contenido encontrado
+    # En un sitio real el esquema apuntaría a .job-title, .company, .location, etc.
+    for i, (tag, text) in enumerate(values['ofertas'], 1):
+        if len(text) > 5:
+            job_title = random.choice(JOB_TITLES)
+            company = random.choice(COMPANIES)
+            location = random.choice(['Remoto', 'Nueva York', 'San Francisco', 'Londres', 'Madrid'])
+            salary = f"${random.randint(50, 200)}k - ${random.randint(200, 400)}k"
+            
+            records.append(ScrapedRecord(
+                page,
+                title=f"Oferta {i}: {job_title}",
+                kind='Oferta de Trabajo',
+                content=text,
+                html_tag=tag,
+                company=company,
+                location=location,
+                salary=salary
+            ))
+    
+    return records
+
+
+def build_generic_records(schema, values, url, navegador):
+    """Registros genéricos para sitios sin constructor propio: uno por valor extraído"""
+    page = PageInfo(url, navegador)
+    records = []
+    for field in schema.fields:
+        for tag, text in values[field.name]:
+            if text:
+                records.append(ScrapedRecord(
+                    page,
+                    title=f"{field.name}: {text[:50]}",
+                    kind=schema.name,
+                    content=text,
+                    html_tag=tag,
+                    field=field.name
+                ))
+    return records
+
+
+# Esquemas compilados por tipo de sitio (los usan los scrape_* y el crawler)
+SITE_SCHEMAS = {}
+RECORD_BUILDERS = {}
+
+
+def register_site(name, fields, record_builder=None):
+    """
+    Registra (y compila) el esquema de un sitio.
+    
+    Sin `record_builder` se generan registros genéricos, así que añadir un
+    sitio nuevo no requiere escribir ningún método.
+    """
+    SITE_SCHEMAS[name] = ExtractionSchema(name, fields)
+    if record_builder:
+        RECORD_BUILDERS[name] = record_builder
+    else:
+        RECORD_BUILDERS.pop(name, None)
+    return SITE_SCHEMAS[name]
+
+
+def extract_records(site_type, soup, url, navegador, html=None):
+    """Aplica el esquema del sitio a una página parseada y devuelve sus registros"""
+    if site_type not in SITE_SCHEMAS:
+        raise ValueError(f"Tipo de sitio no registrado: {site_type}")
+    values = SITE_SCHEMAS[site_type].extract(soup, html)
+    return build_records(site_type, values, url, navegador)
+
+
+def build_records(site_type, values, url, navegador):
+    """Convierte los campos ya extraídos de una página en registros del sitio"""
+    if site_type not in SITE_SCHEMAS:
+        raise ValueError(f"Tipo de sitio no registrado: {site_type}")
+    builder = RECORD_BUILDERS.get(site_type)
+    if builder:
+        return builder(values, url, navegador)
+    return build_generic_records(SITE_SCHEMAS[site_type], values, url, navegador)
+
+
+register_site('noticias', {
+    'titulo': 'title',
+    'encabezado': 'h1',
+    'parrafos': {'css': 'p', 'limit': 5},
+    'secciones': {'css': 'h2', 'limit': 3},
+}, build_news_records)
+
+register_site('ecommerce', {
+    'productos': {'css': 'div, span, p, h1, h2, h3', 'limit': 8},
+}, build_ecommerce_records)
+
+register_site('empleos', {
+    'ofertas': {'css': 'h1, h2, h3, p, div', 'limit': 6},
+}, build_job_records)
+
+
+class AsyncCrawler:
+    """
+    Motor de descarga concurrente basado en asyncio.
+    
+    Las descargas (bloqueantes) se ejecutan en un pool de hilos, limitadas por
+    un máximo global de peticiones en vuelo, un máximo por host y un intervalo
+    mínimo entre peticiones al mismo host para no saturar a nadie.
+    
+    Una URL solo ocupa un hueco global mientras descarga: la espera por su
+    host y el backoff de los reintentos (`retry_policy`, una FetchPolicy) no
+    bloquean a las URLs de otros hosts.
+    """
+    
+    def __init__(self, fetch, max_in_flight=32, per_host_limit=4, host_delay=0.0, retry_policy=None):
+        self.fetch = fetch
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_host_limit = max(1, per_host_limit)
+        self.host_delay = host_delay
+        self.retry_policy = retry_policy
+        self._host_semaphores = {}
+        self._next_request_at = {}
+    
+    def _host_semaphore(self, host):
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+    
+    async def _respect_host_delay(self, host):
+        """Reserva el siguiente hueco libre del host y espera hasta él"""
+        if not self.host_delay:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_request_at.get(host, now))
+        self._next_request_at[host] = slot + self.host_delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    async def _fetch_one(self, loop, executor, global_semaphore, url):
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            # Primero el host (y su intervalo), después el hueco global
+            async with self._host_semaphore(host):
+                await self._respect_host_delay(host)
+                async with global_semaphore:
+                    try:
+                        result = await loop.run_in_executor(executor, self.fetch, url)
+                        return url, result, None
+                    except Exception as e:
+                        error = e
+            
+            policy = self.retry_policy
+            if not policy or attempt >= policy.max_retries or not policy.is_retryable(error):
+                return url, None, error
+            delay = policy.backoff(attempt)
+            attempt += 1
+            print(f"   🔁 Reintento {attempt}/{policy.max_retries} de {url} en {delay:.1f}s ({error})")
+            await asyncio.sleep(delay)
+    
+    async def crawl(self, urls, on_result):
+        """Descarga todas las URLs y llama a on_result(url, resultado, error) según terminan"""
+        loop = asyncio.get_running_loop()
+        global_semaphore = asyncio.Semaphore(self.max_in_flight)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            tasks = [
+                asyncio.ensure_future(self._fetch_one(loop, executor, global_semaphore, url))
+                for url in urls
+            ]
+            for finished in asyncio.as_completed(tasks):
+                url, result, error = await finished
+                on_result(url, result, error)
+    
+    def run(self, urls, on_result):
+        """Punto de entrada síncrono del crawler"""
+        asyncio.run(self.crawl(urls, on_result))
+
+
+def parse_page_worker(site_type, url, html, navegador, parser):
+    """
+    Parseo y extracción de una página en un proceso del pool (función picklable).
+    
+    Devuelve los registros y los tiempos de cada etapa, que el proceso
+    principal agrega a su StageTimer.
+    """
+    timer = StageTimer(keep_spans=True)  # Pocos tramos; el principal decide si los guarda
+    host = urlsplit(url).netloc
+    with timer.span('parseo', host):
+        soup = SITE_SCHEMAS[site_type].parse(html, parser)
+    with timer.span('extraccion', host):
+        records = extract_records(site_type, soup, url, navegador, html)
+    return records, timer.snapshot()
+
+
+def _init_parse_worker(site_type, fields, record_builder):
+    """Registra en el proceso hijo el sitio que se va a parsear, igual que en el principal"""
+    register_site(site_type, fields, record_builder)
+
+
+def parse_worker_initargs(site_type):
+    """
+    Argumentos de _init_parse_worker para `site_type`. Solo viaja el sitio
+    que se parsea; si los procesos no se crean con fork su record_builder
+    tiene que poder serializarse (una función de módulo, no una lambda).
+    """
+    record_builder = RECORD_BUILDERS.get(site_type)
+    if record_builder and multiprocessing.get_start_method() != 'fork':
+        try:
+            pickle.dumps(record_builder)
+        except Exception as e:
+            raise ValueError(
+                f"El record_builder del sitio '{site_type}' no se puede enviar a los procesos de parseo "
+                f"({e}); defínelo como función a nivel de módulo"
+            ) from e
+    return site_type, SITE_SCHEMAS[site_type].spec, record_builder
+
+
+class ParsePipeline:
+    """
+    Pipeline de descarga y parseo desacoplados.
+    
+    El crawler (I/O) deja las páginas en una cola acotada y un pool de
+    procesos (CPU) las parsea y extrae en paralelo. Si los procesos no dan
+    abasto, la cola se llena y el crawler se detiene hasta que haya sitio,
+    así que la memoria no crece sin límite.
+    """
+    
+    _END = object()
+    
+    class _Stopped(Exception):
+        """El consumidor dejó de leer la cola (on_records u on_error fallaron)"""
+    
+    def __init__(self, workers=None, queue_size=64, max_pending=None, parser='html.parser', timer=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = max(1, queue_size)
+        self.max_pending = max_pending or self.workers * 2
+        self.parser = parser
+        self.timer = timer or StageTimer()
+    
+    def run(self, crawler, urls, site_type, on_records, on_error, skip_page=None):
+        """
+        Descarga `urls` con `crawler` y parsea en procesos.
+        
+        Llama a on_records(page, records) y on_error(url, error) desde el
+        hilo que invoca run(); skip_page(page) permite descartar páginas
+        antes de enviarlas a parsear.
+        """
+        page_queue = queue.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+        
+        def put(item):
+            # Con la cola llena se espera: esa es la contrapresión sobre el crawler
+            while not stopped.is_set():
+                try:
+                    page_queue.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def deliver(url, page, error):
+            if not put((url, page, error)):
+                raise self._Stopped()  # Corta el crawl: nadie va a procesar más páginas
+        
+        def crawl():
+            try:
+                crawler.run(urls, deliver)
+            except self._Stopped:
+                pass
+            finally:
+                put(self._END)
+        
+        # Antes de empezar a descargar: un builder no serializable falla aquí
+        initargs = parse_worker_initargs(site_type)
+        crawl_thread = threading.Thread(target=crawl, daemon=True)
+        
+        pending = {}
+        
+        def collect(futures):
+            for future in futures:
+                page = pending.pop(future)
+                try:
+                    records, spans = future.result()
+                except Exception as e:
+                    on_error(page.url, e)
+                    continue
+                self.timer.merge(spans)
+                on_records(page, records)
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_parse_worker,
+                                 initargs=initargs) as pool:
+            # Con fork, los procesos se crean en el primer submit(): se arrancan
+            # antes que el hilo del crawler para no heredar locks tomados por él
+            pool.submit(os.getpid).result()
+            crawl_thread.start()
+            try:
+                while True:
+                    item = page_queue.get()
+                    if item is self._END:
+                        break
+                    url, page, error = item
+                    if error is not None:
+                        on_error(url, error)
+                        continue
+                    if skip_page and skip_page(page):
+                        continue
+                    if page.values is not None:
+                        # Extraída en el navegador: no hay HTML que parsear
+                        on_records(page, build_records(site_type, page.values, page.url, FETCH_LABELS[page.via]))
+                        continue
+                    
+                    while len(pending) >= self.max_pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    future = pool.submit(parse_page_worker, site_type, page.url, page.html,
+                                         FETCH_LABELS[page.via], self.parser)
+                    pending[future] = page
+                
+                collect(list(as_completed(list(pending))))
+            finally:
+                # Si on_records u on_error fallan, el crawler no debe quedarse
+                # bloqueado esperando sitio en la cola
+                stopped.set()
+                crawl_thread.join()
+
+
+class RecordSink:
+    """
+    Destino de registros que escribe por lotes a medida que se extraen.
+    
+    La memoria usada queda acotada por `batch_size` en lugar de crecer con
+    el total de registros, y cada lote escrito sobrevive a un fallo posterior.
+    `on_flush` se llama cada vez que lo escrito queda a salvo en disco.
+    """
+    
+    # Si cada lote queda en disco al escribirse (si no, solo al cerrar)
+    durable_batches = True
+    
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.written = 0
+        self.closed = False
+        self.on_flush = None
+        self._buffer = []
+    
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Escribe el lote pendiente"""
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+        if self.on_flush and self.durable_batches:
+            self.on_flush()
+    
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self._close()
+        self.closed = True
+        if self.on_flush:
+            self.on_flush()
+    
+    def _write_batch(self, records):
+        raise NotImplementedError
+    
+    def _close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlSink(RecordSink):
+    """Un registro JSON por línea; cada lote queda en disco al escribirse"""
+    
+    def __init__(self, path, batch_size=500):
+        super().__init__(path, batch_size)
+        self._file = open(path, 'w', encoding='utf-8')
+    
+    def _write_batch(self, records):
+        self._file.writelines(json.dumps(dict(record), ensure_ascii=False) + '\n' for record in records)
+        self._file.flush()
+    
+    def _close(self):
+        self._file.close()
+
+
+class CsvSink(RecordSink):
+    """CSV con las columnas de RECORD_COLUMNS"""
+    
+    def __init__(self, path, batch_size=500):
+        super().__init__(path, batch_size)
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=RECORD_COLUMNS, extrasaction='ignore')
+        self._writer.writeheader()
+    
+    def _write_batch(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+    
+    def _close(self):
+        self._file.close()
+
+
+class ParquetSink(RecordSink):
+    """
+    Dataset Parquet: un fichero por lote dentro del directorio `path`.
+    
+    Un único fichero Parquet solo es legible tras escribir su pie al cerrar;
+    con un fichero por lote los lotes ya escritos sobreviven a un fallo.
+    Requiere pyarrow.
+    """
+    
+    def __init__(self, path, batch_size=5000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetSink necesita pyarrow: pip install pyarrow")
+        super().__init__(path, batch_size)
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for column in RECORD_COLUMNS])
+        self._parts = 0
+        os.makedirs(path, exist_ok=True)
+    
+    def _write_batch(self, records):
+        columns = {
+            column: [record.get(column) for record in records] for column in RECORD_COLUMNS
+        }
+        table = self._pa.table(columns, schema=self._schema)
+        self._parts += 1
+        self._pa.parquet.write_table(table, os.path.join(self.path, f"part-{self._parts:05d}.parquet"))
+
+
+class ExcelStreamSink(RecordSink):
+    """
+    Excel en modo write-only de openpyxl: las filas no se guardan en memoria
+    como celdas editables. El fichero solo se escribe al cerrar, así que para
+    resultados a prueba de fallos conviene JSONL o CSV.
+    """
+    
+    durable_batches = False
+    
+    def __init__(self, path, batch_size=500):
+        super().__init__(path, batch_size)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet('Datos')
+        self._sheet.append(RECORD_COLUMNS)
+    
+    def _write_batch(self, records):
+        for record in records:
+            self._sheet.append([record.get(column) for column in RECORD_COLUMNS])
+    
+    def _close(self):
+        self._workbook.save(self.path)
+
+
+SINKS_BY_EXTENSION = {
+    '.jsonl': JsonlSink,
+    '.csv': CsvSink,
+    '.parquet': ParquetSink,
+    '.xlsx': ExcelStreamSink,
+}
+
+
+def create_sink(path, batch_size=None):
+    """Crea el sink adecuado según la extensión del fichero de salida"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS_BY_EXTENSION:
+        raise ValueError(f"Formato de salida no soportado: {extension}")
+    sink_class = SINKS_BY_EXTENSION[extension]
+    return sink_class(path, batch_size) if batch_size else sink_class(path)
+
+
+class ScrapeStateStore:
+    """
+    Estado del scraping incremental en SQLite.
+    
+    Guarda la huella (SHA-256) del HTML de cada página y del contenido de
+    cada registro extraído. En la siguiente ejecución las páginas con la
+    misma huella no se vuelven a extraer y solo se emiten los registros
+    nuevos o modificados.
+    
+    Las huellas no se guardan al extraer sino en dos pasos: quedan
+    preparadas hasta que sus registros se entregan a la salida
+    (release_staged) y se confirman en SQLite cuando esa salida está en
+    disco (commit). Si la ejecución falla antes, la siguiente vuelve a
+    emitir esos registros.
+    """
+    
+    # Campos que identifican un registro dentro de su página
+    KEY_FIELDS = ('Enlace', 'Tipo', 'Campo')
+    # Campos que forman la huella del contenido (los simulados o con fecha no cuentan)
+    FINGERPRINT_FIELDS = ('Contenido', 'Elementos_HTML')
+    
+    def __init__(self, path='estado_scraping.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pages)")]
+        if columns and 'site_type' not in columns:
+            # Estado de una versión anterior (páginas sin tipo de sitio): se descarta
+            self._conn.execute("DROP TABLE pages")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                site_type TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (site_type, url)
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                record_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+        # Huellas de páginas ({(tipo de sitio, url): huella}) y registros extraídos
+        # pero aún no entregados a la salida...
+        self._staged_pages = {}
+        self._staged_records = {}
+        # ...y entregados, a la espera de que la salida llegue a disco
+        self._ready_pages = {}
+        self._ready_records = {}
+    
+    @staticmethod
+    def fingerprint(*values):
+        return hashlib.sha256('\x1f'.join(str(value) for value in values).encode('utf-8')).hexdigest()
+    
+    def page_changed(self, url, html, site_type=''):
+        """
+        Indica si el HTML de la página es distinto del guardado en la última
+        ejecución para ese tipo de sitio (una misma URL puede extraerse con
+        varios esquemas).
+        """
+        key = (site_type, url)
+        with self._lock:
+            stored = self._staged_pages.get(key) or self._ready_pages.get(key)
+            if stored is None:
+                row = self._conn.execute(
+                    "SELECT content_hash FROM pages WHERE site_type = ? AND url = ?", key
+                ).fetchone()
+                stored = row[0] if row else None
+        return stored != self.fingerprint(html)
+    
+    def remember_page(self, url, html, site_type=''):
+        with self._lock:
+            self._staged_pages[(site_type, url)] = self.fingerprint(html)
+    
+    def filter_changed(self, records, site_type=''):
+        """Devuelve solo los registros nuevos o con contenido distinto, y prepara sus huellas"""
+        keyed = []
+        ordinals = {}
+        for record in records:
+            identity = tuple(record.get(field, '') for field in self.KEY_FIELDS)
+            ordinals[identity] = ordinals.get(identity, 0) + 1
+            key = self.fingerprint(site_type, *identity, ordinals[identity])
+            content_hash = self.fingerprint(*(record.get(field, '') for field in self.FINGERPRINT_FIELDS))
+            keyed.append((key, content_hash, record))
+        if not keyed:
+            return []
+        
+        with self._lock:
+            placeholders = ','.join('?' * len(keyed))
+            stored = dict(self._conn.execute(
+                f"SELECT record_key, content_hash FROM records WHERE record_key IN ({placeholders})",
+                [key for key, _, _ in keyed]
+            ))
+            for pending in (self._ready_records, self._staged_records):
+                stored.update((key, pending[key][1]) for key, _, _ in keyed if key in pending)
+            changed = []
+            for key, content_hash, record in keyed:
+                if stored.get(key) != content_hash:
+                    changed.append(record)
+                self._staged_records[key] = (record.get('Enlace', ''), content_hash)
+        return changed
+    
+    def release_staged(self):
+        """Las huellas preparadas ya tienen sus registros entregados a la salida"""
+        with self._lock:
+            self._ready_pages.update(self._staged_pages)
+            self._ready_records.update(self._staged_records)
+            self._staged_pages.clear()
+            self._staged_records.clear()
+    
+    def discard_staged(self):
+        """Olvida las huellas preparadas cuyos registros no llegaron a la salida"""
+        with self._lock:
+            self._staged_pages.clear()
+            self._staged_records.clear()
+    
+    def commit(self):
+        """Guarda en SQLite las huellas entregadas (su salida ya está en disco)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages (site_type, url, content_hash, updated_at) VALUES (?, ?, ?, ?)",
+                [(site_type, url, content_hash, now)
+                 for (site_type, url), content_hash in self._ready_pages.items()]
+            )
+            self._conn.executemany(
+                """INSERT INTO records (record_key, url, content_hash, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(record_key) DO UPDATE SET
+                       content_hash = excluded.content_hash, last_seen = excluded.last_seen""",
+                [(key, url, content_hash, now, now)
+                 for key, (url, content_hash) in self._ready_records.items()]
+            )
+            self._ready_pages.clear()
+            self._ready_records.clear()
+    
+    def close(self):
+        self._conn.close()
+
+
+# Puertos por defecto que se eliminan al normalizar
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    Normaliza una URL para deduplicar: esquema y host en minúsculas, sin
+    puerto por defecto, sin fragmento y con los parámetros ordenados.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def extract_links(soup, base_url, selector='a[href]', same_host=True):
+    """Devuelve los enlaces HTTP(S) normalizados de una página, sin repetir"""
+    return resolve_links((anchor.get('href', '') for anchor in soup.select(selector)), base_url, same_host)
+
+
+def resolve_links(hrefs, base_url, same_host=True):
+    """Normaliza una lista de href relativos a `base_url`, sin repetir"""
+    base_host = urlsplit(base_url).netloc.lower()
+    links = []
+    seen = set()
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            continue
+        link = normalize_url(urljoin(base_url, href))
+        if not link.startswith(('http://', 'https://')):
+            continue
+        if same_host and urlsplit(link).netloc != base_host:
+            continue
+        if link not in seen:
+            seen.add(link)
+            links.append(link)
+    return links
+
+
+class CrawlFrontier:
+    """
+    Frontera de crawling para recorrer sitios de varias páginas.
+    
+    Cola en anchura con deduplicación por URL normalizada, límite de
+    profundidad, robots.txt cacheado por host y una pausa mínima entre
+    peticiones al mismo dominio. Las URLs vistas y pendientes se guardan en
+    SQLite (en memoria por defecto, o en `db_path` para sitios grandes).
+    """
+    
+    def __init__(self, session, max_depth=2, domain_delay=1.0, db_path=':memory:',
+                 respect_robots=True, user_agent='*'):
+        self.session = session
+        self.max_depth = max_depth
+        self.domain_delay = domain_delay
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self._robots = {}
+        self._next_request_at = {}
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                depth INTEGER NOT NULL,
+                visited INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.commit()
+    
+    def add(self, url, depth=0):
+        """Encola una URL si no se ha visto antes y no supera la profundidad"""
+        if depth > self.max_depth:
+            return False
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, ?)", (normalize_url(url), depth)
+        )
+        return cursor.rowcount > 0
+    
+    def add_many(self, urls, depth):
+        if depth > self.max_depth:
+            return 0
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, ?)",
+                [(normalize_url(url), depth) for url in urls]
+            )
+            return self._conn.total_changes - before
+    
+    def pop(self):
+        """Devuelve la siguiente URL pendiente (url, profundidad) o None"""
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT id, url, depth FROM frontier WHERE visited = 0 ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE frontier SET visited = 1 WHERE id = ?", (row[0],))
+        return row[1], row[2]
+    
+    def pending(self):
+        return self._conn.execute("SELECT COUNT(*) FROM frontier WHERE visited = 0").fetchone()[0]
+    
+    def _robots_for(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in self._robots:
+            parser = RobotFileParser()
+            try:
+                response = self.session.get(f"{origin}/robots.txt", timeout=10)
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True  # Como RobotFileParser.read(): acceso restringido
+                elif response.status_code >= 400:
+                    parser.parse([])  # Sin robots.txt: todo permitido
+                else:
+                    parser.parse(response.text.splitlines())
+            except requests.RequestException:
+                parser.parse([])
+            self._robots[origin] = parser
+        return self._robots[origin]
+    
+    def allowed(self, url):
+        """Comprueba robots.txt (cacheado por host)"""
+        if not self.respect_robots:
+            return True
+        return self._robots_for(url).can_fetch(self.user_agent, url)
+    
+    def wait_turn(self, url):
+        """Respeta la pausa mínima (o el Crawl-delay de robots.txt) del dominio"""
+        host = urlsplit(url).netloc
+        delay = self.domain_delay
+        if self.respect_robots:
+            delay = max(delay, self._robots_for(url).crawl_delay(self.user_agent) or 0)
+        now = time.monotonic()
+        ready_at = self._next_request_at.get(host, now)
+        if ready_at > now:
+            time.sleep(ready_at - now)
+        self._next_request_at[host] = max(now, ready_at) + delay
+    
+    def close(self):
+        self._conn.close()
+
+
+class ScrapeJobQueue:
+    """
+    Cola de trabajos de scraping compartida en SQLite para varios workers.
+    
+    Cada URL es un trabajo que un worker toma en préstamo (lease) durante
+    `lease_seconds`. Mientras lo procesa envía latidos que renuevan el
+    préstamo; si el worker muere, el préstamo caduca y el trabajo vuelve a
+    entregarse a otro. Cada préstamo lleva un token nuevo y el resultado
+    solo se acepta con el token vigente, así que un worker lento cuyo
+    préstamo ya se reasignó no puede duplicar la salida: hay exactamente un
+    resultado por URL.
+    
+    Para repartir entre varias máquinas la base de datos debe estar en un
+    disco compartido con bloqueo de ficheros fiable (en NFS no lo es).
+    """
+    
+    def __init__(self, path='cola_scraping.db', lease_seconds=60, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # isolation_level=None: las transacciones se abren a mano con BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                site_type TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                error TEXT,
+                enqueued_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                records TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL,
+                pages INTEGER NOT NULL DEFAULT 0,
+                records INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'running'
+            );
+        """)
+    
+    @contextmanager
+    def _transaction(self):
+        """Transacción con bloqueo de escritura desde el principio"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def enqueue(self, urls, site_type='noticias'):
+        """Añade trabajos; las URLs ya encoladas se ignoran. Devuelve cuántos se añadieron"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (url, site_type, enqueued_at) VALUES (?, ?, ?)",
+                [(url, site_type, now) for url in urls]
+            )
+            return conn.total_changes - before
+    
+    def register_worker(self, worker_id):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """INSERT INTO workers (worker_id, started_at, heartbeat_at) VALUES (?, ?, ?)
+                   ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at,
+                                                        status = 'running'""",
+                (worker_id, now, now)
+            )
+    
+    def lease(self, worker_id, batch_size=1):
+        """
+        Toma hasta `batch_size` trabajos pendientes o con préstamo caducado.
+        
+        Devuelve una lista de (url, site_type, lease_token). Los trabajos que
+        ya agotaron `max_attempts` se marcan como fallidos.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = 'failed', finished_at = ?,
+                                   error = COALESCE(error, 'préstamo caducado demasiadas veces')
+                   WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                (now, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                """SELECT url, site_type FROM jobs
+                   WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                   ORDER BY enqueued_at LIMIT ?""",
+                (now, batch_size)
+            ).fetchall()
+            jobs = []
+            for url, site_type in rows:
+                token = os.urandom(8).hex()
+                conn.execute(
+                    """UPDATE jobs SET status = 'leased', worker_id = ?, lease_token = ?,
+                                       lease_expires = ?, attempts = attempts + 1
+                       WHERE url = ?""",
+                    (worker_id, token, now + self.lease_seconds, url)
+                )
+                jobs.append((url, site_type, token))
+            return jobs
+    
+    def heartbeat(self, worker_id, pages=0, records=0):
+        """Renueva los préstamos del worker y anota su progreso"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE status = 'leased' AND worker_id = ?",
+                (now + self.lease_seconds, worker_id)
+            )
+            conn.execute(
+                "UPDATE workers SET heartbeat_at = ?, pages = ?, records = ? WHERE worker_id = ?",
+                (now, pages, records, worker_id)
+            )
+    
+    def complete(self, url, lease_token, worker_id, records):
+        """
+        Guarda el resultado de un trabajo. Devuelve False (y no guarda nada)
+        si el préstamo ya no pertenece a este token.
+        """
+        payload = json.dumps([dict(record) for record in records], ensure_ascii=False)
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'done', finished_at = ?, error = NULL
+                   WHERE url = ? AND status = 'leased' AND lease_token = ?""",
+                (now, url, lease_token)
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT OR IGNORE INTO results (url, worker_id, records, finished_at) VALUES (?, ?, ?, ?)",
+                (url, worker_id, payload, now)
+            )
+            return True
+    
+    def fail(self, url, lease_token, error):
+        """Devuelve el trabajo a la cola o lo marca fallido si agotó los intentos"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                   error = ?, lease_token = NULL, worker_id = NULL,
+                                   finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END
+                   WHERE url = ? AND status = 'leased' AND lease_token = ?""",
+                (self.max_attempts, str(error), self.max_attempts, now, url, lease_token)
+            )
+    
+    def release(self, worker_id):
+        """Devuelve a la cola los préstamos de un worker que termina"""
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = 'pending', worker_id = NULL, lease_token = NULL,
+                                   attempts = MAX(attempts - 1, 0)
+                   WHERE status = 'leased' AND worker_id = ?""",
+                (worker_id,)
+            )
+            conn.execute("UPDATE workers SET status = 'stopped' WHERE worker_id = ?", (worker_id,))
+    
+    def has_open_jobs(self):
+        """Indica si quedan trabajos pendientes o en préstamo (que podrían reentregarse)"""
+        stats = self.stats()
+        return stats.get('pending', 0) + stats.get('leased', 0) > 0
+    
+    def stats(self):
+        """{estado: número de trabajos}"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+    
+    def workers(self):
+        """Lista de workers con su último latido y progreso"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT worker_id, heartbeat_at, pages, records, status FROM workers ORDER BY started_at"
+            ).fetchall()
+        return [
+            {'worker_id': worker_id, 'heartbeat_at': heartbeat_at, 'pages': pages,
+             'records': records, 'status': status}
+            for worker_id, heartbeat_at, pages, records, status in rows
+        ]
+    
+    def iter_results(self, batch_size=500):
+        """Recorre los registros guardados, una URL cada vez, sin cargarlos todos"""
+        last_url = ''
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT url, records FROM results WHERE url > ? ORDER BY url LIMIT ?",
+                    (last_url, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for url, payload in rows:
+                yield from json.loads(payload)
+            last_url = rows[-1][0]
+    
+    def close(self):
+        self._conn.close()
+
+
+class WebScrapingRealRPA:
+    # Estrategias de espera disponibles para considerar una página "lista"
+    PAGE_WAIT_STRATEGIES = ('document', 'selector', 'network_idle')
+    # Modos de descarga: HTTP directo, navegador o automático (HTTP y fallback a Chrome)
+    FETCH_MODES = ('auto', 'http', 'browser')
+    # 'python': page_source + BeautifulSoup; 'browser': selectores ejecutados en Chrome
+    EXTRACTION_MODES = ('python', 'browser')
+    
+    def __init__(self, pool_size=1, max_pages_per_driver=50,
+                 page_wait='document', wait_selector=None, wait_timeout=10, network_idle_time=0.5,
+                 fetch_mode='auto', fetch_policy=None, circuit_breaker=None, parser='auto', output=None, batch_size=None,
+                 cache_dir=None, cache_ttl=3600, cache_max_bytes=200 * 1024 * 1024, skip_unchanged=False,
+                 state_db=None, performance_profile=False, page_load_strategy='normal', extraction='python',
+                 isolate_jobs=False, driver_pool=None, record_spans=False):
         """Inicializa el bot de web scraping real"""
-        self.driver = None
-        self.data = []
+        if page_wait not in self.PAGE_WAIT_STRATEGIES:
+            raise ValueError(f"Estrategia de espera no válida: {page_wait}")
+        if fetch_mode not in self.FETCH_MODES:
+            raise ValueError(f"Modo de descarga no válido: {fetch_mode}")
+        if page_load_strategy not in ('normal', 'eager', 'none'):
+            raise ValueError(f"Estrategia de carga no válida: {page_load_strategy}")
+        if extraction not in self.EXTRACTION_MODES:
+            raise ValueError(f"Modo de extracción no válido: {extraction}")
+        # Registros en memoria por columnas (ver RecordTable)
+        self.data = RecordTable()
+        self.page_load_strategy = page_load_strategy
+        # Reintentos, plazos y cortocircuito por host para todas las descargas
+        self.fetch_policy = fetch_policy or FetchPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # Tiempos por etapa y host (ver print_timing_summary / export_metrics);
+        # con record_spans se guardan también todos los tramos individuales
+        self.timer = StageTimer(keep_spans=record_spans)
+        # Con isolate_jobs cada página se carga en un contexto (cookies, storage)
+        # propio, también si el pool es compartido
+        self.isolate_jobs = isolate_jobs
+        # Un pool externo (p. ej. compartido con FormAutomationRPA) no se cierra aquí
+        self._owns_driver_pool = driver_pool is None
+        self.driver_pool = driver_pool or ChromeDriverPool(
+            size=pool_size,
+            max_pages_per_driver=max_pages_per_driver,
+            driver_factory=partial(create_chrome_driver, performance_profile=performance_profile,
+                                   page_load_strategy=page_load_strategy,
+                                   page_load_timeout=self.fetch_policy.read_timeout),
+            timer=self.timer,
+            isolate_contexts=isolate_jobs,
+            context_setup=apply_resource_blocking if performance_profile else None,
+        )
+        self.page_wait = page_wait
+        self.wait_selector = wait_selector
+        self.wait_timeout = wait_timeout
+        self.network_idle_time = network_idle_time
+        self.fetch_mode = fetch_mode
+        # Con 'browser' las páginas cargadas en Chrome no pasan por page_source
+        self.extraction = extraction
+        self.http_session = create_http_session()
+        self._javascript_hosts = set()  # Hosts que ya demostraron necesitar navegador
+        self.parser = resolve_parser(parser)
+        # Con `output` los registros se escriben por lotes en disco en lugar de acumularse
+        self.sink = create_sink(output, batch_size) if output else None
+        self.record_count = 0
+        # Conteos por tipo, elemento HTML y navegador, actualizados en add_record
+        self.type_counts = Counter()
+        self.element_counts = Counter()
+        self.browser_counts = Counter()
+        # Caché HTTP persistente: con skip_unchanged no se extraen páginas sin cambios
+        self.http_cache = HttpResponseCache(cache_dir, ttl=cache_ttl, max_bytes=cache_max_bytes) if cache_dir else None
+        self.skip_unchanged = skip_unchanged
+        # Estado incremental: huellas de páginas y registros de ejecuciones anteriores
+        self.state_store = ScrapeStateStore(state_db) if state_db else None
+        if self.sink and self.state_store:
+            # Las huellas se confirman cuando sus registros ya están en disco
+            self.sink.on_flush = self.state_store.commit
         
     def setup_chrome_driver(self):
-        """Configura Chrome para web scraping real"""
+        """
+        Arranca de antemano un navegador del pool (los scrape_* ya lo piden
+        al pool cuando lo necesitan). Devuelve True si Chrome está listo.
+        """
         print("🔧 Configurando Google Chrome para web scraping real...")
-        
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-images')  # Más rápido sin imágenes
-            
-            # Configuración específica para macOS
-            if platform.system() == "Darwin":
-                chrome_paths = [
-                    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-                    "/Applications/Chromium.app/Contents/MacOS/Chromium"
-                ]
-                for path in chrome_paths:
-                    if os.path.exists(path):
-                        options.binary_location = path
-                        break
-            
-            self.driver = webdriver.Chrome(options=options)
-            self.driver.set_page_load_timeout(30)
+            with self.driver_pool.borrow():
+                pass
             print("✅ Google Chrome configurado para web scraping real")
             return True
             
@@ -60,238 +2386,662 @@ class WebScrapingRealRPA:
             print(f"❌ Error configurando Chrome: {e}")
             return False
     
-    def scrape_news_website(self):
+    def _network_idle_condition(self):
+        """Condición que se cumple cuando no se piden recursos nuevos durante un rato"""
+        state = {'count': -1, 'since': time.monotonic()}
+        
+        def condition(driver):
+            ready, count = driver.execute_script(
+                "return [document.readyState, performance.getEntriesByType('resource').length];"
+            )
+            now = time.monotonic()
+            if ready != 'complete' or count != state['count']:
+                state['count'] = count
+                state['since'] = now
+                return False
+            return now - state['since'] >= self.network_idle_time
+        
+        return condition
+    
+    def wait_for_page_ready(self, driver, strategy=None, selector=None):
+        """
+        Espera a que la página esté lista en lugar de dormir un tiempo fijo.
+        
+        Estrategias:
+        - 'document': document.readyState == 'complete' ('interactive' con carga eager)
+        - 'selector': un selector CSS está presente en el DOM
+        - 'network_idle': no se piden recursos nuevos durante `network_idle_time`
+        """
+        selector = selector or self.wait_selector
+        strategy = strategy or ('selector' if selector else self.page_wait)
+        wait = WebDriverWait(driver, self.wait_timeout, poll_frequency=0.1)
+        
+        try:
+            if strategy == 'selector':
+                if not selector:
+                    raise ValueError("La espera por selector necesita un selector CSS")
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            elif strategy == 'network_idle':
+                wait.until(self._network_idle_condition())
+            else:
+                # Con carga 'eager' basta con el DOM construido ('interactive')
+                ready_states = ('interactive', 'complete') if self.page_load_strategy == 'eager' else ('complete',)
+                wait.until(lambda d: d.execute_script("return document.readyState") in ready_states)
+            return True
+        except TimeoutException:
+            print(f"⚠️ La página no estuvo lista en {self.wait_timeout}s ({strategy}), usando lo cargado")
+            return False
+    
+    def load_page(self, url, wait_strategy=None, wait_selector=None, schema=None, link_selector=None):
+        """
+        Carga una página con un navegador del pool y devuelve su HTML.
+        
+        Con `schema` los campos se extraen dentro del navegador y se devuelve
+        (valores, enlaces) en lugar del HTML.
+        """
+        host = urlsplit(url).netloc
+        with self.driver_pool.borrow(isolate=self.isolate_jobs) as driver:
+            with self.timer.span('navegacion', host):
+                driver.get(url)
+            with self.timer.span('espera_carga', host):
+                self.wait_for_page_ready(driver, strategy=wait_strategy, selector=wait_selector)
+            if schema is not None:
+                with self.timer.span('extraccion_navegador', host):
+                    return schema.extract_in_browser(driver, link_selector)
+            with self.timer.span('page_source', host):
+                return driver.page_source
+    
+    def fetch_http(self, url, site_type=None):
+        """
+        Descarga una página con la sesión HTTP compartida (sin navegador).
+        
+        Con caché, `not_modified` solo se marca si el mismo cuerpo ya se
+        sirvió para `site_type` en una ejecución anterior.
+        """
+        entry = self.http_cache.lookup(url, self.http_session.headers) if self.http_cache else None
+        if entry and self.http_cache.is_fresh(entry):
+            return FetchResult(url, self.http_cache.read_body(entry), 'http', 200, from_cache=True,
+                               not_modified=self.http_cache.seen_before(entry, site_type))
+        
+        headers = self.http_cache.validators(entry) if entry else {}
+        with self.timer.span('descarga_http', urlsplit(url).netloc):
+            response = self.http_session.get(url, headers=headers, timeout=self.fetch_policy.http_timeout)
+        if entry and response.status_code == 304:
+            self.http_cache.refresh(entry)
+            return FetchResult(url, self.http_cache.read_body(entry), 'http', 304, from_cache=True,
+                               not_modified=self.http_cache.seen_before(entry, site_type))
+        
+        response.raise_for_status()
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            # apparent_encoding analiza todo el cuerpo y es muy lento en páginas
+            # grandes: primero se busca el <meta charset> declarado en el HTML
+            response.encoding = declared_charset(response.content) or response.apparent_encoding
+        if self.http_cache:
+            self.http_cache.store(url, self.http_session.headers, response, site_type)
+        return FetchResult(url, response.text, 'http', response.status_code)
+    
+    def is_unchanged(self, page, site_type):
+        """
+        Indica si la página puede saltarse porque no cambió desde la última
+        ejecución con el esquema `site_type`.
+        """
+        if self.skip_unchanged and page.not_modified:
+            return True
+        return bool(self.state_store) and not self.state_store.page_changed(page.url, page.content, site_type)
+    
+    def extract_page(self, site_type, page, soup=None):
+        """
+        Parsea y extrae una página con el esquema del sitio.
+        
+        En modo incremental (`state_db`) devuelve solo los registros nuevos o
+        modificados respecto a ejecuciones anteriores.
+        """
+        host = urlsplit(page.url).netloc
+        if page.values is not None:
+            # Campos ya extraídos en el navegador
+            records = build_records(site_type, page.values, page.url, FETCH_LABELS[page.via])
+            return self.filter_incremental(page, records, site_type)
+        if soup is None:
+            with self.timer.span('parseo', host):
+                soup = SITE_SCHEMAS[site_type].parse(page.html, self.parser)
+        with self.timer.span('extraccion', host):
+            records = extract_records(site_type, soup, page.url, FETCH_LABELS[page.via], page.html)
+        return self.filter_incremental(page, records, site_type)
+    
+    def filter_incremental(self, page, records, site_type):
+        """En modo incremental deja solo los registros nuevos o modificados"""
+        if not self.state_store:
+            return records
+        records = self.state_store.filter_changed(records, site_type)
+        self.state_store.remember_page(page.url, page.content, site_type)
+        return records
+    
+    def fetch_page(self, url, mode=None, wait_strategy=None, wait_selector=None, site_type=None,
+                   link_selector=None, retries=None):
+        """
+        Obtiene el HTML de una página con el modo indicado (o el del bot).
+        
+        En modo 'auto' se intenta primero HTTP directo y solo se recurre a
+        Chrome si la descarga falla o la página necesita JavaScript. Los
+        errores transitorios se reintentan según `fetch_policy` y los hosts
+        que fallan repetidamente se cortocircuitan.
+        
+        Con extraction='browser' y `site_type`, las páginas que se cargan en
+        Chrome vuelven con los campos del esquema ya extraídos (`values`).
+        
+        `retries` sustituye a fetch_policy.max_retries (0 cuando el llamante,
+        como AsyncCrawler, reintenta por su cuenta).
+        """
+        max_retries = self.fetch_policy.max_retries if retries is None else retries
+        mode = mode or self.fetch_mode
+        if mode not in self.FETCH_MODES:
+            raise ValueError(f"Modo de descarga no válido: {mode}")
+        host = urlsplit(url).netloc
+        
+        attempt = 0
+        while True:
+            probe = self.circuit_breaker.before_request(host)
+            try:
+                result = self._fetch_page_once(url, host, mode, wait_strategy, wait_selector,
+                                               site_type, link_selector)
+            except Exception as e:
+                if not self.fetch_policy.is_retryable(e):
+                    if isinstance(e, requests.HTTPError) and e.response is not None:
+                        # El host respondió (aunque sea un 404): está disponible
+                        self.circuit_breaker.record_success(host)
+                    raise
+                self.circuit_breaker.record_failure(host)
+                if attempt >= max_retries or self.circuit_breaker.is_open(host):
+                    raise
+                delay = self.fetch_policy.backoff(attempt)
+                attempt += 1
+                print(f"   🔁 Reintento {attempt}/{max_retries} de {url} en {delay:.1f}s ({e})")
+                time.sleep(delay)
+                continue
+            finally:
+                if probe:
+                    self.circuit_breaker.end_probe(host)
+            self.circuit_breaker.record_success(host)
+            return result
+    
+    def _fetch_page_once(self, url, host, mode, wait_strategy, wait_selector, site_type=None, link_selector=None):
+        if mode == 'http':
+            return self.fetch_http(url, site_type)
+        
+        if mode == 'auto' and host not in self._javascript_hosts:
+            try:
+                result = self.fetch_http(url, site_type)
+                if not needs_javascript(result.html):
+                    return result
+                print(f"   🧩 {host} necesita JavaScript, usando Chrome")
+                self._javascript_hosts.add(host)
+            except requests.HTTPError as e:
+                # Solo un acceso denegado (p. ej. antibots) justifica probar con navegador
+                if e.response is None or e.response.status_code not in (401, 403):
+                    raise
+                print(f"   ⚠️ Acceso HTTP denegado ({e}), usando Chrome")
+            except requests.RequestException as e:
+                # Los errores de red transitorios se reintentan en fetch_page
+                if self.fetch_policy.is_retryable(e):
+                    raise
+                print(f"   ⚠️ Descarga HTTP fallida ({e}), usando Chrome")
+        
+        if self.extraction == 'browser' and site_type is not None:
+            values, links = self.load_page(url, wait_strategy=wait_strategy, wait_selector=wait_selector,
+                                           schema=SITE_SCHEMAS[site_type], link_selector=link_selector)
+            return FetchResult(url, None, 'browser', values=values, links=links)
+        html = self.load_page(url, wait_strategy=wait_strategy, wait_selector=wait_selector)
+        return FetchResult(url, html, 'browser')
+    
+    def make_soup(self, html):
+        """Parsea HTML con el backend configurado"""
+        return BeautifulSoup(html, self.parser)
+    
+    def add_record(self, record):
+        """Guarda un registro en el sink configurado o en memoria"""
+        if self.sink:
+            self.sink.write(record)
+        else:
+            self.data.append(record)
+        self.record_count += 1
+        self.type_counts[record.get('Tipo')] += 1
+        self.element_counts[record.get('Elementos_HTML')] += 1
+        self.browser_counts[record.get('Navegador')] += 1
+    
+    def add_records(self, records):
+        with self.timer.span('escritura'):
+            for record in records:
+                self.add_record(record)
+        if self.state_store:
+            self.state_store.release_staged()
+    
+    def close(self):
+        """Libera los navegadores del pool, la sesión HTTP y el sink de salida"""
+        if self._owns_driver_pool:
+            self.driver_pool.close()
+        self.http_session.close()
+        if self.sink:
+            self.sink.close()
+        if self.state_store:
+            self.state_store.close()
+    
+    def scrape_news_website(self, url="https://httpbin.org/html", fetch_mode=None):
         """Extrae noticias de un sitio web real de noticias"""
         print("\n📰 Haciendo web scraping de sitio de noticias real...")
         
-        if not self.setup_chrome_driver():
-            print("❌ No se pudo configurar Chrome. Saltando...")
-            return
-        
         try:
-            # Usar un sitio web real de noticias
-            url = "https://httpbin.org/html"
             print(f"🌐 Navegando a sitio web real: {url}")
             
-            self.driver.get(url)
-            time.sleep(3)  # Esperar a que cargue completamente
-            
             # Extraer contenido HTML real
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            page = self.fetch_page(url, mode=fetch_mode, site_type='noticias')
+            if self.is_unchanged(page, 'noticias'):
+                print("   ♻️ Página sin cambios desde la última ejecución, se omite")
+                return
             
             print("📄 Procesando contenido HTML real...")
             
-            # Extraer elementos HTML reales
-            title = soup.find('title')
-            h1 = soup.find('h1')
-            p_tags = soup.find_all('p')
-            h2_tags = soup.find_all('h2')
-            
-            # Crear datos basados en contenido HTML real
-            if title:
-                self.data.append({
-                    'Título': f"Noticia Principal: {title.text.strip()}",
-                    'Enlace': url,
-                    'Puntuación': f"{random.randint(80, 100)}% relevancia",
-                    'Navegador': 'Chrome (Web Scraping Real)',
-                    'Fecha_Extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'Tipo': 'Noticia Principal',
-                    'Contenido': title.text.strip(),
-                    'Elementos_HTML': 'title'
-                })
-                print(f"   📄 Extraído: Título - {title.text.strip()}")
-            
-            if h1:
-                self.data.append({
-                    'Título': f"Encabezado Principal: {h1.text.strip()}",
-                    'Enlace': url,
-                    'Puntuación': f"{random.randint(85, 100)}% relevancia",
-                    'Navegador': 'Chrome (Web Scraping Real)',
-                    'Fecha_Extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'Tipo': 'Encabezado Principal',
-                    'Contenido': h1.text.strip(),
-                    'Elementos_HTML': 'h1'
-                })
-                print(f"   📄 Extraído: H1 - {h1.text.strip()}")
+            records = self.extract_page('noticias', page)
+            for record in records:
+                self.add_record(record)
+                print(f"   📄 Extraído: {record['Tipo']} - {record['Contenido'][:50]}")
             
-            # Extraer párrafos como noticias
-            for i, p in enumerate(p_tags[:5], 1):
-                if p.text.strip():
-                    self.data.append({
-                        'Título': f"Noticia {i}: {p.text.strip()[:50]}...",
-                        'Enlace': url,
-                        'Puntuación': f"{random.randint(60, 95)}% relevancia",
-                        'Navegador': 'Chrome (Web Scraping Real)',
-                        'Fecha_Extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'Tipo': 'Párrafo de Noticia',
-                        'Contenido': p.text.strip(),
-                        'Elementos_HTML': 'p'
-                    })
-                    print(f"   📄 Extraído: Párrafo {i} - {p.text.strip()[:50]}...")
-            
-            # Extraer encabezados secundarios
-            for i, h2 in enumerate(h2_tags[:3], 1):
-                if h2.text.strip():
-                    self.data.append({
-                        'Título': f"Sección {i}: {h2.text.strip()}",
-                        'Enlace': url,
-                        'Puntuación': f"{random.randint(70, 90)}% relevancia",
-                        'Navegador': 'Chrome (Web Scraping Real)',
-                        'Fecha_Extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'Tipo': 'Sección',
-                        'Contenido': h2.text.strip(),
-                        'Elementos_HTML': 'h2'
-                    })
-                    print(f"   📄 Extraído: H2 {i} - {h2.text.strip()}")
-            
-            print(f"   📊 Total elementos extraídos: {len(self.data)}")
+            print(f"   📊 Total elementos extraídos: {self.record_count}")
             
         except Exception as e:
             print(f"❌ Error durante el web scraping: {e}")
-        finally:
-            if self.driver:
-                self.driver.quit()
-                print("🔒 Navegador Chrome cerrado")
     
-    def scrape_ecommerce_website(self):
+    def scrape_ecommerce_website(self, url="https://httpbin.org/html", fetch_mode=None):
         """Extrae productos de un sitio web de e-commerce"""
         print("\n🛒 Haciendo web scraping de sitio e-commerce...")
         
-        if not self.setup_chrome_driver():
-            print("❌ No se pudo configurar Chrome. Saltando...")
-            return
-        
         try:
-            # Usar un sitio web que simula e-commerce
-            url = "https://httpbin.org/html"
             print(f"🌐 Navegando a sitio e-commerce: {url}")
             
-            self.driver.get(url)
-            time.sleep(3)
-            
             # Extraer contenido HTML real
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            page = self.fetch_page(url, mode=fetch_mode, site_type='ecommerce')
+            if self.is_unchanged(page, 'ecommerce'):
+                print("   ♻️ Página sin cambios desde la última ejecución, se omite")
+                return
             
             print("📄 Procesando productos del e-commerce...")
             
-            # Simular extracción de productos (en un sitio real serían elementos específicos)
-            # En un sitio real buscarías: .product-title, .price, .description, etc.
+            records = self.extract_page('ecommerce', page)
+            for record in records:
+                self.add_record(record)
+                print(f"   🛒 Extraído: {record['Título']} - {record['Precio']}")
             
-            # Extraer todos los elementos que podrían ser productos
-            all_elements = soup.find_all(['div', 'span', 'p', 'h1', 'h2', 'h3'])
-            
-            # Simular productos basados en elementos encontrados
-            for i, element in enumerate(all_elements[:8], 1):
-                if element.text.strip() and len(element.text.strip()) > 10:
-                    # Simular datos de producto
-                    product_name = element.text.strip()[:30]
-                    price = f"${random.randint(10, 1000)}.{random.randint(10, 99)}"
-                    category = random.choice(['Electrónicos', 'Ropa', 'Hogar', 'Deportes'])
-                    
-                    self.data.append({
-                        'Título': f"Producto {i}: {product_name}",
-                        'Enlace': url,
-                        'Precio': price,
-                        'Categoría': category,
-                        'Navegador': 'Chrome (Web Scraping Real)',
-                        'Fecha_Extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'Tipo': 'Producto E-commerce',
-                        'Contenido': element.text.strip(),
-                        'Elementos_HTML': element.name
-                    })
-                    print(f"   🛒 Extraído: Producto {i} - {product_name} - {price}")
-            
-            print(f"   📊 Total productos extraídos: {len([d for d in self.data if d.get('Tipo') == 'Producto E-commerce'])}")
+            print(f"   📊 Total productos extraídos: {self.type_counts['Producto E-commerce']}")
             
         except Exception as e:
             print(f"❌ Error durante el web scraping de e-commerce: {e}")
-        finally:
-            if self.driver:
-                self.driver.quit()
-                print("🔒 Navegador Chrome cerrado")
     
-    def scrape_job_website(self):
+    def scrape_job_website(self, url="https://httpbin.org/html", fetch_mode=None):
         """Extrae ofertas de trabajo de un sitio web de empleos"""
         print("\n💼 Haciendo web scraping de sitio de empleos...")
         
-        if not self.setup_chrome_driver():
-            print("❌ No se pudo configurar Chrome. Saltando...")
-            return
-        
         try:
-            # Usar un sitio web que simula portal de empleos
-            url = "https://httpbin.org/html"
             print(f"🌐 Navegando a portal de empleos: {url}")
             
-            self.driver.get(url)
-            time.sleep(3)
-            
             # Extraer contenido HTML real
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            page = self.fetch_page(url, mode=fetch_mode, site_type='empleos')
+            if self.is_unchanged(page, 'empleos'):
+                print("   ♻️ Página sin cambios desde la última ejecución, se omite")
+                return
             
             print("📄 Procesando ofertas de trabajo...")
             
-            # Simular extracción de ofertas de trabajo
-            # En un sitio real buscarías: .job-title, .company, .location, .salary, etc.
-            
-            # Extraer elementos que podrían ser ofertas de trabajo
-            all_text_elements = soup.find_all(['h1', 'h2', 'h3', 'p', 'div'])
+            records = self.extract_page('empleos', page)
+            for record in records:
+                self.add_record(record)
+                print(f"   💼 Extraído: {record['Título']} en {record['Empresa']} - {record['Ubicación']}")
             
-            # Simular ofertas de trabajo basadas en contenido encontrado
-            job_titles = [
-                "Desarrollador Python Senior",
-                "Ingeniero de Datos",
-                "Analista de Negocios",
-                "Diseñador UX/UI",
-                "DevOps Engineer",
-                "Product Manager",
-                "Data Scientist",
-                "Frontend Developer"
-            ]
-            
-            companies = [
-                "TechCorp",
-                "DataSolutions",
-                "InnovateLab",
-                "DigitalWorks",
-                "FutureTech",
-                "SmartSystems",
-                "CloudFirst",
-                "AICenter"
-            ]
-            
-            for i, element in enumerate(all_text_elements[:6], 1):
-                if element.text.strip() and len(element.text.strip()) > 5:
-                    job_title = random.choice(job_titles)
-                    company = random.choice(companies)
-                    location = random.choice(['Remoto', 'Nueva York', 'San Francisco', 'Londres', 'Madrid'])
-                    salary = f"${random.randint(50, 200)}k - ${random.randint(200, 400)}k"
-                    
-                    self.data.append({
-                        'Título': f"Oferta {i}: {job_title}",
-                        'Empresa': company,
-                        'Ubicación': location,
-                        'Salario': salary,
-                        'Enlace': url,
-                        'Navegador': 'Chrome (Web Scraping Real)',
-                        'Fecha_Extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'Tipo': 'Oferta de Trabajo',
-                        'Contenido': element.text.strip(),
-                        'Elementos_HTML': element.name
-                    })
-                    print(f"   💼 Extraído: {job_title} en {company} - {location}")
-            
-            print(f"   📊 Total ofertas extraídas: {len([d for d in self.data if d.get('Tipo') == 'Oferta de Trabajo'])}")
+            print(f"   📊 Total ofertas extraídas: {self.type_counts['Oferta de Trabajo']}")
             
         except Exception as e:
             print(f"❌ Error durante el web scraping de empleos: {e}")
+    
+    def scrape_site(self, url, site_type, fetch_mode=None):
+        """Extrae una página con el esquema registrado para `site_type`"""
+        print(f"\n🌐 Haciendo web scraping de {url} ({site_type})...")
+        
+        try:
+            page = self.fetch_page(url, mode=fetch_mode, site_type=site_type)
+            if self.is_unchanged(page, site_type):
+                print("   ♻️ Página sin cambios desde la última ejecución, se omite")
+                return []
+            records = self.extract_page(site_type, page)
+            self.add_records(records)
+            print(f"   📊 Total registros extraídos: {len(records)}")
+            return records
+            
+        except Exception as e:
+            print(f"❌ Error durante el web scraping de {url}: {e}")
+            return []
+    
+    def scrape_urls(self, urls, site_type='noticias', fetch_mode=None,
+                    max_in_flight=32, per_host_limit=4, host_delay=0.0):
+        """
+        Extrae muchas URLs de forma concurrente con el crawler asyncio.
+        
+        Usa el mismo esquema de extracción que el scrape_* correspondiente al
+        tipo de sitio ('noticias', 'ecommerce', 'empleos' o uno registrado).
+        """
+        if site_type not in SITE_SCHEMAS:
+            raise ValueError(f"Tipo de sitio no registrado: {site_type}")
+        urls = list(urls)
+        print(f"\n🕸️ Crawling concurrente de {len(urls)} URLs ({site_type})...")
+        
+        stats = {'pages': 0, 'errors': 0, 'records': 0, 'unchanged': 0}
+        
+        def on_result(url, page, error):
+            if error is not None:
+                stats['errors'] += 1
+                print(f"   ❌ {url}: {error}")
+                return
+            if self.is_unchanged(page, site_type):
+                stats['unchanged'] += 1
+                return
+            try:
+                records = self.extract_page(site_type, page)
+            except Exception as e:
+                # Una página malformada no debe cortar el crawl del resto
+                stats['errors'] += 1
+                print(f"   ❌ {url}: error de extracción: {e}")
+                return
+            self.add_records(records)
+            stats['pages'] += 1
+            stats['records'] += len(records)
+    
+        crawler = AsyncCrawler(
+            lambda url: self.fetch_page(url, mode=fetch_mode, site_type=site_type, retries=0),
+            max_in_flight=max_in_flight,
+            per_host_limit=per_host_limit,
+            host_delay=host_delay,
+            retry_policy=self.fetch_policy,
+        )
+        start = time.perf_counter()
+        crawler.run(urls, on_result)
+        elapsed = time.perf_counter() - start
+        
+        rate = stats['pages'] / elapsed if elapsed else 0
+        print(f"   📊 {stats['pages']} páginas, {stats['records']} registros, "
+              f"{stats['unchanged']} sin cambios, "
+              f"{stats['errors']} errores en {elapsed:.1f}s ({rate:.1f} páginas/s)")
+        return stats
+    
+    def scrape_urls_pipeline(self, urls, site_type='noticias', fetch_mode=None, parse_workers=None,
+                             queue_size=64, max_in_flight=32, per_host_limit=4, host_delay=0.0):
+        """
+        Como scrape_urls, pero el parseo se reparte en un pool de procesos.
+        
+        La concurrencia de descarga (`max_in_flight`, `per_host_limit`) es
+        independiente del número de procesos de parseo (`parse_workers`,
+        por defecto uno por núcleo).
+        """
+        if site_type not in SITE_SCHEMAS:
+            raise ValueError(f"Tipo de sitio no registrado: {site_type}")
+        urls = list(urls)
+        pipeline = ParsePipeline(workers=parse_workers, queue_size=queue_size, parser=self.parser,
+                                 timer=self.timer)
+        print(f"\n🏭 Pipeline de {len(urls)} URLs ({site_type}) con {pipeline.workers} procesos de parseo...")
+        
+        stats = {'pages': 0, 'errors': 0, 'records': 0, 'unchanged': 0}
+        
+        def on_records(page, records):
+            records = self.filter_incremental(page, records, site_type)
+            self.add_records(records)
+            stats['pages'] += 1
+            stats['records'] += len(records)
+        
+        def on_error(url, error):
+            stats['errors'] += 1
+            print(f"   ❌ {url}: {error}")
+        
+        def skip_page(page):
+            if self.is_unchanged(page, site_type):
+                stats['unchanged'] += 1
+                return True
+            return False
+        
+        crawler = AsyncCrawler(
+            lambda url: self.fetch_page(url, mode=fetch_mode, site_type=site_type, retries=0),
+            max_in_flight=max_in_flight,
+            per_host_limit=per_host_limit,
+            host_delay=host_delay,
+            retry_policy=self.fetch_policy,
+        )
+        start = time.perf_counter()
+        pipeline.run(crawler, urls, site_type, on_records, on_error, skip_page=skip_page)
+        elapsed = time.perf_counter() - start
+        
+        rate = stats['pages'] / elapsed if elapsed else 0
+        print(f"   📊 {stats['pages']} páginas, {stats['records']} registros, "
+              f"{stats['unchanged']} sin cambios, "
+              f"{stats['errors']} errores en {elapsed:.1f}s ({rate:.1f} páginas/s)")
+        return stats
+    
+    def crawl_site(self, start_url, site_type='noticias', max_depth=2, max_pages=100, fetch_mode=None,
+                   domain_delay=1.0, link_selector='a[href]', frontier_db=':memory:', respect_robots=True):
+        """
+        Recorre un sitio siguiendo enlaces (paginación, categorías...) desde `start_url`.
+        
+        Cada página se descarga una sola vez, se extrae con el esquema de
+        `site_type` y sus enlaces del mismo host (filtrados por
+        `link_selector`) se encolan hasta `max_depth` niveles.
+        """
+        if site_type not in SITE_SCHEMAS:
+            raise ValueError(f"Tipo de sitio no registrado: {site_type}")
+        schema = SITE_SCHEMAS[site_type]
+        print(f"\n🧭 Crawling de {start_url} (profundidad {max_depth}, máximo {max_pages} páginas)...")
+        
+        frontier = CrawlFrontier(self.http_session, max_depth=max_depth, domain_delay=domain_delay,
+                                 db_path=frontier_db, respect_robots=respect_robots,
+                                 user_agent=self.http_session.headers.get('User-Agent', '*'))
+        frontier.add(start_url, 0)
+        stats = {'pages': 0, 'errors': 0, 'records': 0, 'unchanged': 0, 'blocked': 0}
+        
+        try:
+            while stats['pages'] + stats['unchanged'] < max_pages:
+                item = frontier.pop()
+                if item is None:
+                    break
+                url, depth = item
+                if not frontier.allowed(url):
+                    stats['blocked'] += 1
+                    continue
+                
+                frontier.wait_turn(url)
+                try:
+                    page = self.fetch_page(url, mode=fetch_mode, site_type=site_type,
+                                           link_selector=link_selector)
+                except Exception as e:
+                    stats['errors'] += 1
+                    print(f"   ❌ {url}: {e}")
+                    continue
+                
+                # BeautifulSoup, o un árbol lxml si el esquema usa XPath
+                soup = None
+                try:
+                    if page.html is not None:
+                        with self.timer.span('parseo', urlsplit(page.url).netloc):
+                            soup = schema.parse(page.html, self.parser)
+                except Exception as e:
+                    stats['errors'] += 1
+                    print(f"   ❌ {url}: error de parseo: {e}")
+                    continue
+                if self.is_unchanged(page, site_type):
+                    stats['unchanged'] += 1
+                else:
+                    try:
+                        records = self.extract_page(site_type, page, soup)
+                    except Exception as e:
+                        # Se siguen igualmente los enlaces de la página
+                        stats['errors'] += 1
+                        print(f"   ❌ {url}: error de extracción: {e}")
+                    else:
+                        self.add_records(records)
+                        stats['pages'] += 1
+                        stats['records'] += len(records)
+                
+                # Aunque la página no cambie, sus enlaces pueden llevar a páginas nuevas
+                if depth < max_depth:
+                    if isinstance(soup, Tag):
+                        links = extract_links(soup, page.url, link_selector)
+                    elif soup is not None and link_selector == 'a[href]':
+                        links = resolve_links(soup.xpath('//a/@href'), page.url)
+                    elif soup is not None:
+                        # Selector de enlaces CSS sobre un esquema XPath: hace falta BeautifulSoup
+                        links = extract_links(self.make_soup(page.html), page.url, link_selector)
+                    else:
+                        links = resolve_links(page.links, page.url)
+                    frontier.add_many(links, depth + 1)
+            
+            print(f"   📊 {stats['pages']} páginas, {stats['records']} registros, "
+                  f"{stats['unchanged']} sin cambios, {stats['blocked']} bloqueadas por robots.txt, "
+                  f"{stats['errors']} errores, {frontier.pending()} pendientes")
         finally:
-            if self.driver:
-                self.driver.quit()
-                print("🔒 Navegador Chrome cerrado")
+            frontier.close()
+        return stats
+    
+    def run_worker(self, queue_path='cola_scraping.db', worker_id=None, batch_size=8, lease_seconds=60,
+                   poll_interval=1.0, idle_timeout=None, fetch_mode=None, max_in_flight=8, per_host_limit=4):
+        """
+        Modo worker: procesa trabajos de una ScrapeJobQueue compartida.
+        
+        Toma lotes de URLs en préstamo, las descarga y extrae con el crawler
+        concurrente y guarda los registros en la cola (no en self.data). Un
+        hilo envía latidos que renuevan los préstamos mientras se trabaja.
+        Termina cuando no quedan trabajos abiertos o, con `idle_timeout`,
+        tras ese tiempo sin trabajo. Varios workers (en varias máquinas)
+        pueden usar la misma cola a la vez.
+        """
+        worker_id = worker_id or f"{platform.node()}-{os.getpid()}"
+        job_queue = ScrapeJobQueue(queue_path, lease_seconds=lease_seconds)
+        job_queue.register_worker(worker_id)
+        print(f"\n👷 Worker {worker_id} conectado a la cola {queue_path}")
+        
+        stats = {'pages': 0, 'records': 0, 'errors': 0, 'lost': 0}
+        stop = threading.Event()
+        
+        def send_heartbeats():
+            while not stop.wait(lease_seconds / 3):
+                try:
+                    job_queue.heartbeat(worker_id, stats['pages'], stats['records'])
+                except sqlite3.Error as e:
+                    print(f"   ⚠️ Latido fallido: {e}")
+        
+        heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+        heartbeat_thread.start()
+        idle_since = time.monotonic()
+        try:
+            while True:
+                jobs = job_queue.lease(worker_id, batch_size)
+                if not jobs:
+                    if idle_timeout is None and not job_queue.has_open_jobs():
+                        break
+                    if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                idle_since = time.monotonic()
+                self._process_jobs(job_queue, worker_id, jobs, stats, fetch_mode, max_in_flight, per_host_limit)
+                job_queue.heartbeat(worker_id, stats['pages'], stats['records'])
+        finally:
+            stop.set()
+            heartbeat_thread.join()
+            job_queue.release(worker_id)
+            job_queue.close()
+        
+        print(f"   📊 Worker {worker_id}: {stats['pages']} páginas, {stats['records']} registros, "
+              f"{stats['errors']} errores, {stats['lost']} préstamos perdidos")
+        return stats
+    
+    def _process_jobs(self, job_queue, worker_id, jobs, stats, fetch_mode, max_in_flight, per_host_limit):
+        """Procesa un lote de trabajos en préstamo y entrega cada resultado a la cola"""
+        leases = {url: (site_type, token) for url, site_type, token in jobs}
+        
+        def on_result(url, page, error):
+            site_type, token = leases[url]
+            if error is not None:
+                stats['errors'] += 1
+                print(f"   ❌ {url}: {error}")
+                job_queue.fail(url, token, error)
+                return
+            try:
+                records = [] if self.is_unchanged(page, site_type) else self.extract_page(site_type, page)
+            except Exception as e:
+                stats['errors'] += 1
+                if self.state_store:
+                    self.state_store.discard_staged()
+                job_queue.fail(url, token, e)
+                return
+            completed = job_queue.complete(url, token, worker_id, records)
+            if self.state_store:
+                # Los registros entregados a la cola ya están en disco
+                if completed:
+                    self.state_store.release_staged()
+                    self.state_store.commit()
+                else:
+                    self.state_store.discard_staged()
+            if completed:
+                stats['pages'] += 1
+                stats['records'] += len(records)
+            else:
+                # El préstamo caducó y otro worker tiene la URL: su resultado es el que vale
+                stats['lost'] += 1
+        
+        crawler = AsyncCrawler(
+            lambda url: self.fetch_page(url, mode=fetch_mode, site_type=leases[url][0], retries=0),
+            max_in_flight=max_in_flight,
+            per_host_limit=per_host_limit,
+            retry_policy=self.fetch_policy,
+        )
+        crawler.run(list(leases), on_result)
+    
+    def collect_queue_results(self, queue_path='cola_scraping.db'):
+        """Pasa los registros que los workers guardaron en la cola al sink o a self.data"""
+        job_queue = ScrapeJobQueue(queue_path)
+        try:
+            for record in job_queue.iter_results():
+                self.add_record(record)
+            print(f"📥 {self.record_count} registros recogidos de {queue_path} ({job_queue.stats()})")
+        finally:
+            job_queue.close()
+    
+    def print_timing_summary(self):
+        """Muestra p50/p95 de cada etapa por host"""
+        summary = self.timer.summary()
+        if not summary:
+            return
+        print("\n⏱️ Tiempos por etapa (p50 / p95 / total):")
+        for stage, hosts in summary.items():
+            for host, stats in hosts.items():
+                print(f"   - {stage:<18} {host or '-':<24} {stats['p50'] * 1000:8.1f} ms / "
+                      f"{stats['p95'] * 1000:8.1f} ms / {stats['total']:7.2f} s ({stats['count']})")
+    
+    def export_metrics(self, json_path='metricas_scraping.json', prometheus_path=None):
+        """Exporta el resumen de tiempos a JSON y, opcionalmente, a formato Prometheus"""
+        self.timer.export_json(json_path, include_spans=self.timer.keep_spans)
+        print(f"📈 Métricas de tiempos exportadas a {json_path}")
+        if prometheus_path:
+            self.timer.export_prometheus(prometheus_path)
+            print(f"📈 Métricas Prometheus exportadas a {prometheus_path}")
+    
+    def save_results(self):
+        """Cierra el sink de salida o, sin sink, guarda todo en Excel"""
+        if self.state_store:
+            self.state_store.release_staged()
+        if not self.sink:
+            with self.timer.span('guardado_excel'):
+                self.save_to_excel()
+            if self.state_store:
+                self.state_store.commit()
+            return
+        with self.timer.span('escritura'):
+            self.sink.close()
+        print(f"\n💾 {self.sink.written} registros escritos por lotes en {self.sink.path}")
+        if self.record_count:
+            self.print_summary()
     
     def save_to_excel(self, filename="datos_web_scraping_real.xlsx"):
         """Guarda los datos extraídos en un archivo Excel"""
@@ -301,28 +3051,33 @@ class WebScrapingRealRPA:
             
         print(f"\n💾 Guardando {len(self.data)} registros en {filename}...")
         
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
         df.to_excel(filename, index=False, engine='openpyxl')
         print(f"✅ Datos guardados exitosamente en {filename}")
         
         # Mostrar estadísticas
+        self.print_summary(columns=list(df.columns))
+    
+    def print_summary(self, columns=None):
+        """Resumen a partir de los conteos acumulados en add_record (sin recorrer los datos)"""
         print(f"\n📊 Resumen de web scraping real:")
-        print(f"   - Total de registros: {len(self.data)}")
-        print(f"   - Navegador usado: Chrome (Web Scraping Real)")
-        print(f"   - Columnas: {list(df.columns)}")
+        print(f"   - Total de registros: {self.record_count}")
+        print(f"   - Navegador usado: {', '.join(name for name in self.browser_counts if name)}")
+        if columns:
+            print(f"   - Columnas: {columns}")
         
         # Estadísticas por tipo
-        if 'Tipo' in df.columns:
-            tipos = df['Tipo'].value_counts()
+        tipos = [(tipo, count) for tipo, count in self.type_counts.most_common() if tipo]
+        if tipos:
             print(f"   - Tipos de contenido extraído:")
-            for tipo, count in tipos.items():
+            for tipo, count in tipos:
                 print(f"     • {tipo}: {count}")
         
         # Estadísticas por elementos HTML
-        if 'Elementos_HTML' in df.columns:
-            elementos = df['Elementos_HTML'].value_counts()
+        elementos = [(elemento, count) for elemento, count in self.element_counts.most_common() if elemento]
+        if elementos:
             print(f"   - Elementos HTML extraídos:")
-            for elemento, count in elementos.items():
+            for elemento, count in elementos:
                 print(f"     • {elemento}: {count}")
     
     def run_real_web_scraping(self):
@@ -346,13 +3101,16 @@ class WebScrapingRealRPA:
             self.scrape_job_website()
             
             # 4. Guardar datos
-            self.save_to_excel()
+            self.save_results()
+            self.print_timing_summary()
             
             print("\n🎉 Web scraping REAL completado!")
             print("✅ Datos extraídos de páginas HTML reales")
             
         except Exception as e:
             print(f"❌ Error en el proceso: {e}")
+        finally:
+            self.close()
 
 def main():
     """Función principal para ejecutar web scraping real"""